@@ -1,7 +1,11 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
+import asyncio
+import logging
+import orjson
 import sys
 import os
 
@@ -11,12 +15,16 @@ project_root = os.path.dirname(os.path.dirname(current_dir))
 sys.path.append(project_root)
 
 from app.core.template_generator import AlimTalkTemplateGenerator
+from app.core.logging_config import setup_logging
+
+logger = logging.getLogger(__name__)
 
 # FastAPI 앱 생성
 app = FastAPI(
     title="AlimTalk Template Generator API",
     description="카카오 알림톡 템플릿 자동 생성 AI 서비스",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS 설정
@@ -31,21 +39,35 @@ app.add_middleware(
 # 전역 템플릿 생성기 인스턴스
 generator = None
 
-@app.on_event("startup")
-async def startup_event():
-    """앱 시작시 템플릿 생성기 초기화"""
+def init_generator():
+    """템플릿 생성기 초기화 (gunicorn 워커마다 한 번)"""
     global generator
+    setup_logging()
+    if generator is not None:
+        return
     try:
         generator = AlimTalkTemplateGenerator()
-        print("AlimTalk Template Generator initialized successfully")
+        logger.info("AlimTalk Template Generator initialized successfully")
     except Exception as e:
-        print(f"Failed to initialize template generator: {e}")
+        logger.error("Failed to initialize template generator: %s", e)
+
+@app.on_event("startup")
+async def startup_event():
+    """앱 시작시 템플릿 생성기 초기화"""
+    init_generator()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """앱 종료시 버퍼에 남은 토큰 통계 반영"""
+    if generator:
+        await generator.aclose()
 
 # 요청/응답 모델 정의
 class TemplateRequest(BaseModel):
     user_input: str
     business_type: Optional[str] = ""
     message_purpose: Optional[str] = ""
+    relevant_policies: Optional[List[Dict]] = None  # /search-policies 결과를 넘기면 재검색 생략
 
 class PolicySearchRequest(BaseModel):
     query: str
@@ -97,35 +119,68 @@ async def health_check():
     }
 
 @app.post("/generate-template", response_model=TemplateResponse)
-async def generate_template(request: TemplateRequest):
-    """알림톡 템플릿 생성 및 데이터베이스 저장"""
+async def generate_template(request: TemplateRequest, save: bool = True):
+    """알림톡 템플릿 생성 및 데이터베이스 저장 (?save=false 이면 저장 생략)"""
     if not generator:
         raise HTTPException(status_code=500, detail="Template generator not initialized")
     
     try:
-        result = generator.generate_template(
-            user_input=request.user_input,
-            business_type=request.business_type,
-            message_purpose=request.message_purpose
-        )
-        
-        # 데이터베이스에 자동 저장
-        request_id = generator.save_to_database(
+        result = await generator.generate_template(
             user_input=request.user_input,
             business_type=request.business_type,
             message_purpose=request.message_purpose,
-            template_result=result
+            relevant_policies=request.relevant_policies
         )
         
-        # 결과에 request_id 추가
-        if request_id > 0:
-            result['id'] = request_id
+        # 데이터베이스에 자동 저장
+        if save:
+            request_id = await generator.save_to_database_async(
+                user_input=request.user_input,
+                business_type=request.business_type,
+                message_purpose=request.message_purpose,
+                template_result=result
+            )
+            
+            # 결과에 request_id 추가
+            if request_id > 0:
+                result['id'] = request_id
         
         return TemplateResponse(**result)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Template generation failed: {str(e)}")
 
+@app.post("/generate-template/stream")
+async def generate_template_stream(request: TemplateRequest, save: bool = True):
+    """알림톡 템플릿 생성 과정을 NDJSON으로 스트리밍 (마지막 줄이 최종 템플릿)"""
+    if not generator:
+        raise HTTPException(status_code=500, detail="Template generator not initialized")
+    
+    async def event_stream():
+        try:
+            async for event in generator.generate_template_stream(
+                user_input=request.user_input,
+                business_type=request.business_type,
+                message_purpose=request.message_purpose,
+                relevant_policies=request.relevant_policies
+            ):
+                if event["type"] == "result" and save:
+                    request_id = await generator.save_to_database_async(
+                        user_input=request.user_input,
+                        business_type=request.business_type,
+                        message_purpose=request.message_purpose,
+                        template_result=event["template"]
+                    )
+                    if request_id > 0:
+                        event["template"]["id"] = request_id
+                
+                yield orjson.dumps(event) + b"\n"
+        except Exception as e:
+            # 응답 헤더가 이미 전송되었으므로 오류도 스트림 이벤트로 전달
+            yield orjson.dumps({"type": "error", "detail": f"Template generation failed: {str(e)}"}) + b"\n"
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
 @app.post("/search-policies", response_model=PolicySearchResponse)
 async def search_policies(request: PolicySearchRequest):
     """정책 문서 검색"""
@@ -133,7 +188,7 @@ async def search_policies(request: PolicySearchRequest):
         raise HTTPException(status_code=500, detail="Template generator not initialized")
     
     try:
-        results = generator.search_relevant_policies(
+        results = await generator.search_relevant_policies_async(
             query=request.query,
             top_k=request.top_k
         )
@@ -154,14 +209,15 @@ async def generate_and_save_template(request: TemplateRequest):
     
     try:
         # 템플릿 생성
-        result = generator.generate_template(
+        result = await generator.generate_template(
             user_input=request.user_input,
             business_type=request.business_type,
-            message_purpose=request.message_purpose
+            message_purpose=request.message_purpose,
+            relevant_policies=request.relevant_policies
         )
         
         # 데이터베이스에 저장
-        request_id = generator.save_to_database(
+        request_id = await generator.save_to_database_async(
             user_input=request.user_input,
             business_type=request.business_type,
             message_purpose=request.message_purpose,
@@ -189,17 +245,15 @@ async def get_template_types():
         ]
     }
 
-@app.get("/token-stats")
-async def get_token_statistics():
-    """토큰 사용량 통계 조회"""
-    if not generator:
-        raise HTTPException(status_code=500, detail="Template generator not initialized")
-    
-    import mysql.connector
+def _query_token_statistics() -> Dict:
+    """토큰 사용량 통계를 DB에서 조회 (블로킹 호출이므로 스레드에서 실행)"""
     from datetime import date, datetime, timedelta
     
+    connection = None
+    cursor = None
+    
     try:
-        connection = mysql.connector.connect(**generator.db_config)
+        connection = generator.get_db_connection()
         cursor = connection.cursor(dictionary=True)
         
         # 최근 30일 통계
@@ -251,9 +305,6 @@ async def get_token_statistics():
             "daily_stats": daily_stats,
             "query_date": datetime.now().isoformat()
         }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Token statistics query failed: {str(e)}")
     
     finally:
         if cursor:
@@ -261,6 +312,19 @@ async def get_token_statistics():
         if connection:
             connection.close()
 
+@app.get("/token-stats")
+async def get_token_statistics():
+    """토큰 사용량 통계 조회"""
+    if not generator:
+        raise HTTPException(status_code=500, detail="Template generator not initialized")
+    
+    try:
+        return await asyncio.to_thread(_query_token_statistics)
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Token statistics query failed: {str(e)}")
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    # uvicorn[standard] 설치 시 uvloop 이벤트 루프와 httptools 파서를 사용 (Windows는 asyncio로 대체)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto")
\ No newline at end of file
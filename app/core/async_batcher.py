@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple
+
+
+class AsyncBatcher:
+    """짧은 시간 창 동안 들어온 요청을 모아 한 번에 처리하는 비동기 배처
+
+    handler는 요청 리스트를 받아 같은 순서의 결과 리스트를 반환하는 코루틴입니다.
+    결과 리스트의 원소가 Exception이면 해당 요청의 호출자에게 예외로 전달됩니다.
+    수집된 배치는 별도 태스크로 처리되므로 이전 배치가 끝나기를 기다리지 않고 다음 배치를 모읍니다.
+    """
+
+    def __init__(self,
+                 handler: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch: int = 16,
+                 max_wait_ms: float = 50.0,
+                 max_concurrency: Optional[int] = None):
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        # 동시에 처리 중인 배치 수 상한 (None이면 제한 없음)
+        self.max_concurrency = max_concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Set[asyncio.Task] = set()
+
+    def _ensure_worker(self):
+        """실행 중인 이벤트 루프에서 백그라운드 워커를 지연 시작"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            if self.max_concurrency is not None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, item: Any) -> Any:
+        """요청을 큐에 넣고 배치 처리 결과를 기다림"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Any, asyncio.Future]]:
+        """첫 요청 이후 max_wait 동안 최대 max_batch개까지 요청 수집"""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+
+            # 배치 처리는 태스크로 띄우고 바로 다음 배치 수집으로 돌아감 (추가 지연은 max_wait 이내)
+            task = loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        """배치 하나를 handler로 처리하고 결과를 각 호출자의 future에 전달"""
+        items = [item for item, _ in batch]
+
+        try:
+            results = await self.handler(items)
+        except Exception as e:
+            results = [e] * len(batch)
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def close(self):
+        """백그라운드 워커 종료 (이미 처리 중인 배치는 끝날 때까지 대기)"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
@@ -0,0 +1,48 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+_listener: Optional[QueueListener] = None
+_listener_pid: Optional[int] = None
+
+
+def setup_logging(level: Optional[str] = None):
+    """루트 로거를 QueueHandler로 설정하고 실제 출력은 백그라운드 스레드에서 처리
+
+    이벤트 루프에서는 큐에 넣기만 하므로 stdout 쓰기로 블로킹되지 않습니다.
+    fork 된 프로세스(gunicorn 워커)에는 리스너 스레드가 없으므로 프로세스마다 새로 시작합니다.
+    """
+    global _listener, _listener_pid
+
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level or os.getenv("LOG_LEVEL", "INFO"))
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 종료"""
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+    _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -0,0 +1,75 @@
+import numpy as np
+import faiss
+import orjson
+from pathlib import Path
+from typing import List, Optional, Union
+
+
+class OnnxSentenceEmbedder:
+    """int8 양자화 ONNX 모델로 문장 임베딩을 생성하는 SentenceTransformer 대체 래퍼
+
+    scripts/export_onnx_embedder.py로 내보낸 디렉토리를 사용하며,
+    SentenceTransformer.encode와 같은 방식(mean pooling)으로 임베딩을 계산합니다.
+    """
+
+    def __init__(self, model_dir: str, file_name: str = "model_quantized.onnx",
+                 num_threads: Optional[int] = None):
+        # optimum/onnxruntime은 ONNX 백엔드를 사용할 때만 필요
+        import onnxruntime
+        from optimum.onnxruntime import ORTModelForFeatureExtraction
+        from transformers import AutoTokenizer
+
+        # num_threads를 지정하면 세션의 연산 스레드 수 제한 (기본값은 모든 코어)
+        session_options = onnxruntime.SessionOptions()
+        if num_threads is not None:
+            session_options.intra_op_num_threads = num_threads
+
+        model_dir = Path(model_dir)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+        # SentenceTransformer와 같은 길이에서 자르도록 max_seq_length 사용 (설정 파일이 없으면 토크나이저 최대 길이)
+        st_config_path = model_dir / "sentence_bert_config.json"
+        if st_config_path.exists():
+            self.max_seq_length = orjson.loads(st_config_path.read_bytes()).get("max_seq_length")
+        else:
+            self.max_seq_length = None
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            model_dir, file_name=file_name, session_options=session_options
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        """임베딩 차원 (SentenceTransformer와 동일한 인터페이스)"""
+        return self.model.config.hidden_size
+
+    def encode(self,
+               sentences: Union[str, List[str]],
+               batch_size: int = 32,
+               convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False,
+               **kwargs) -> np.ndarray:
+        """문장 목록을 float32 임베딩 배열로 변환"""
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        if not sentences:
+            return np.empty((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+
+        # 길이순으로 정렬해 배치별 패딩을 최소화한 뒤 원래 순서로 복원
+        order = np.argsort([len(sentence) for sentence in sentences], kind="stable")
+        sorted_sentences = [sentences[i] for i in order]
+
+        batches = []
+        for start in range(0, len(sorted_sentences), batch_size):
+            batch = sorted_sentences[start:start + batch_size]
+            inputs = self.tokenizer(batch, padding=True, truncation=True,
+                                    max_length=self.max_seq_length, return_tensors="np")
+            token_embeddings = self.model(**inputs).last_hidden_state
+
+            # attention mask 기준 mean pooling
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            batches.append(summed / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        embeddings = np.empty((len(sentences), batches[0].shape[1]), dtype=np.float32)
+        embeddings[order] = np.concatenate(batches)
+        if normalize_embeddings:
+            faiss.normalize_L2(embeddings)
+        return embeddings
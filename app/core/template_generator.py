@@ -1,17 +1,104 @@
-import json
+import asyncio
+import hashlib
+import logging
+import orjson
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
 from pathlib import Path
 import mysql.connector
-from typing import List, Dict, Tuple, Optional
+from mysql.connector import errors, pooling
+import threading
+from typing import AsyncIterator, List, Dict, Tuple, Optional
 import openai
-from datetime import datetime
+from datetime import date, datetime
 import os
+import sys
 from dotenv import load_dotenv
 import re
 
+try:
+    import redis
+except ImportError:
+    redis = None
+
+from app.core.async_batcher import AsyncBatcher
+
+logger = logging.getLogger(__name__)
+
+# 템플릿 변수 #{변수명} 패턴
+_VAR_RE = re.compile(r'#\{([^}]+)\}')
+
+# OpenAI 응답에서 JSON 객체 부분 추출 (첫 '{'부터 마지막 '}'까지)
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+def compute_num_threads() -> int:
+    """프로세스당 연산 스레드 수 (gunicorn 워커는 WORKER_NUM_THREADS로 코어를 나눠 사용)"""
+    return max(1, int(os.getenv('WORKER_NUM_THREADS', os.cpu_count() or 1)))
+
+def set_compute_threads(num_threads: int):
+    """FAISS(OpenMP)와 torch 연산 스레드 수 설정"""
+    faiss.omp_set_num_threads(num_threads)
+    import torch
+    torch.set_num_threads(num_threads)
+
+class _JsonObjectScanner:
+    """스트리밍 텍스트에서 첫 최상위 JSON 객체가 닫히는 시점을 감지 (문자열 안의 괄호는 무시)"""
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._pos = 0
+        self._start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> Optional[str]:
+        """청크를 추가하고, 객체가 완성되면 그 JSON 문자열을 반환"""
+        self._parts.append(chunk)
+        for offset, ch in enumerate(chunk):
+            if self._start is None:
+                if ch == '{':
+                    self._start = self._pos + offset
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == '{':
+                self._depth += 1
+            elif ch == '}':
+                self._depth -= 1
+                if self._depth == 0:
+                    end = self._pos + offset + 1
+                    return self.text[self._start:end]
+        self._pos += len(chunk)
+        return None
+
 class AlimTalkTemplateGenerator:
+    # OpenAI 오류 시 반환할 기본 템플릿 ({user_input}만 치환)
+    _DEFAULT_TEMPLATE = """안녕하세요, #{{고객명}}님.
+
+{user_input}와 관련하여 안내드립니다.
+
+#{{내용}}
+
+문의사항이 있으시면 연락 주시기 바랍니다.
+
+감사합니다.
+#{{업체명}}
+
+수신거부: #{{수신거부링크}}"""
+
     def __init__(self, 
                  faiss_index_path="data/vectors/policy_chunks.faiss",
                  metadata_path="data/vectors/chunks_metadata.json",
@@ -22,15 +109,64 @@ class AlimTalkTemplateGenerator:
         
         # OpenAI API 설정
         openai.api_key = os.getenv('OPENAI_API_KEY')
-        self.openai_client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        self.openai_client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+        
+        # 동시에 들어온 OpenAI 요청을 짧은 시간 창 단위로 묶어 함께 전송
+        self.openai_batcher = AsyncBatcher(
+            self._complete_batch,
+            max_batch=int(os.getenv('OPENAI_BATCH_SIZE', '16')),
+            max_wait_ms=float(os.getenv('OPENAI_BATCH_WAIT_MS', '50'))
+        )
+        
+        # 동시에 들어온 정책 검색 요청을 묶어 한 번에 임베딩/검색
+        self.embedding_batcher = AsyncBatcher(
+            self._search_batch_async,
+            max_batch=int(os.getenv('EMBEDDING_BATCH_SIZE', '32')),
+            max_wait_ms=float(os.getenv('EMBEDDING_BATCH_WAIT_MS', '10'))
+        )
+        
+        # 동시에 들어온 DB 저장 요청을 한 트랜잭션으로 묶어 저장
+        self.db_batcher = AsyncBatcher(
+            self._save_batch,
+            max_batch=int(os.getenv('DB_BATCH_SIZE', '32')),
+            max_wait_ms=float(os.getenv('DB_BATCH_WAIT_MS', '20'))
+        )
         
         # FAISS 인덱스와 메타데이터 로드
+        set_compute_threads(compute_num_threads())
         self.index = faiss.read_index(faiss_index_path)
-        with open(metadata_path, 'r', encoding='utf-8') as f:
-            self.metadata = json.load(f)
+        if hasattr(self.index, 'hnsw'):
+            # HNSW 인덱스는 탐색 폭으로 정확도/속도 조절
+            self.index.hnsw.efSearch = int(os.getenv('FAISS_EF_SEARCH', '64'))
+        elif hasattr(self.index, 'nprobe'):
+            # IVF 인덱스는 탐색할 클러스터 수로 조절 (nprobe는 인덱스 파일에 저장되지 않음)
+            self.index.nprobe = int(os.getenv('FAISS_NPROBE', '8'))
+        self.metadata = orjson.loads(Path(metadata_path).read_bytes())
+        for chunk_data in self.metadata:
+            # 반복되는 문서 타입/출처 문자열은 하나의 객체로 공유
+            chunk_meta = chunk_data.get('metadata', {})
+            for field in ('document_type', 'source_file', 'section'):
+                if isinstance(chunk_meta.get(field), str):
+                    chunk_meta[field] = sys.intern(chunk_meta[field])
+        
+        # 본문이 contents.bin/offsets.npy 로 분리 저장된 경우 mmap 으로 검색된 청크만 읽음
+        contents_path = Path(metadata_path).with_name('contents.bin')
+        if contents_path.exists():
+            self._contents = np.memmap(contents_path, dtype=np.uint8, mode='r')
+            self._content_offsets = np.load(contents_path.with_name('offsets.npy'))
+        else:
+            self._contents = None
+            self._content_offsets = None
         
-        # 임베딩 모델 로드
-        self.embedding_model = SentenceTransformer(model_name)
+        # 임베딩 모델 로드 (EMBEDDING_BACKEND=onnx 이면 int8 양자화 ONNX 모델 사용)
+        if os.getenv('EMBEDDING_BACKEND', 'torch').lower() == 'onnx':
+            from app.core.onnx_embedder import OnnxSentenceEmbedder
+            self.embedding_model = OnnxSentenceEmbedder(
+                os.getenv('ONNX_MODEL_DIR', 'data/models/onnx_embedder'),
+                num_threads=compute_num_threads()
+            )
+        else:
+            self.embedding_model = SentenceTransformer(model_name)
         
         # MySQL 연결 설정
         self.db_config = {
@@ -41,44 +177,221 @@ class AlimTalkTemplateGenerator:
             'charset': os.getenv('DB_CHARSET', 'utf8mb4')
         }
         
-        print(f"Template generator initialized with {self.index.ntotal} policy chunks")
+        # 일일 토큰 통계 버퍼 (API 저장 경로에서 누적 후 주기적으로 한 번에 반영)
+        self.stats_flush_interval = float(os.getenv('STATS_FLUSH_INTERVAL', '5'))
+        self._stats_buffer: Dict[date, Dict] = {}
+        self._stats_lock = asyncio.Lock()
+        self._stats_flush_task: Optional[asyncio.Task] = None
+        
+        # MySQL 커넥션 풀 (첫 사용 시 생성하여 DB 없이도 초기화 가능)
+        self.db_pool_size = int(os.getenv('DB_POOL_SIZE', '10'))
+        self._db_pool = None
+        self._db_pool_lock = threading.Lock()
+        
+        # Redis 캐시 설정 (연결 불가 시 캐시 없이 동작)
+        self.cache_ttl = int(os.getenv('REDIS_CACHE_TTL', '3600'))
+        self.cache = self._connect_cache()
+        
+        logger.info("Template generator initialized with %d policy chunks", self.index.ntotal)
+
+    def _connect_cache(self):
+        """Redis 캐시 연결"""
+        if redis is None:
+            return None
+        
+        try:
+            client = redis.Redis(
+                host=os.getenv('REDIS_HOST', 'localhost'),
+                port=int(os.getenv('REDIS_PORT', '6379')),
+                db=int(os.getenv('REDIS_DB', '0')),
+                password=os.getenv('REDIS_PASSWORD') or None,
+                socket_timeout=0.5
+            )
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning("Redis cache disabled: %s", e)
+            return None
+
+    def _cache_key(self, prefix: str, *parts) -> str:
+        """정규화한 입력값으로 캐시 키 생성"""
+        normalized = "\x1f".join(" ".join(str(part).split()) for part in parts)
+        return f"{prefix}:{hashlib.sha1(normalized.encode('utf-8')).hexdigest()}"
+
+    def _template_cache_key(self, user_input: str, business_type: str, message_purpose: str,
+                            relevant_policies: Optional[List[Dict]]) -> str:
+        """템플릿 캐시 키 (정책을 직접 넘긴 경우 프롬프트에 들어갈 정책 컨텍스트도 키에 포함)"""
+        parts = [user_input, business_type, message_purpose]
+        if relevant_policies is not None:
+            policy_context = self._build_policy_context(relevant_policies)
+            parts.append(hashlib.sha1(policy_context.encode('utf-8')).hexdigest())
+        return self._cache_key("tpl", *parts)
+
+    def _cache_get(self, key: str):
+        """캐시 조회 (오류 시 캐시 미스로 처리)"""
+        if self.cache is None:
+            return None
+        try:
+            cached = self.cache.get(key)
+            return orjson.loads(cached) if cached else None
+        except Exception as e:
+            logger.warning("Redis cache get error: %s", e)
+            return None
+
+    def _cache_set(self, key: str, value):
+        """캐시 저장 (오류는 무시)"""
+        if self.cache is None:
+            return
+        try:
+            self.cache.setex(key, self.cache_ttl, orjson.dumps(value))
+        except Exception as e:
+            logger.warning("Redis cache set error: %s", e)
 
     def search_relevant_policies(self, query: str, top_k: int = 5) -> List[Dict]:
         """사용자 쿼리와 관련된 정책 문서 검색"""
-        # 쿼리 임베딩
-        query_embedding = self.embedding_model.encode([query])
-        query_embedding = np.array(query_embedding).astype('float32')
-        faiss.normalize_L2(query_embedding)
+        # 동일한 쿼리는 임베딩과 FAISS 검색 없이 캐시에서 반환
+        cache_key = self._cache_key("pol", query, top_k)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
-        # 검색 실행
-        scores, indices = self.index.search(query_embedding, top_k)
+        results = self._search_batch([(query, top_k)])[0]
         
-        # 결과 포맷팅
-        results = []
-        for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.metadata):
-                chunk_data = self.metadata[idx]
-                results.append({
-                    'content': chunk_data['content'],
-                    'metadata': chunk_data['metadata'],
-                    'score': float(score)
-                })
+        self._cache_set(cache_key, results)
+        return results
+
+    async def search_relevant_policies_async(self, query: str, top_k: int = 5) -> List[Dict]:
+        """동시 검색 요청을 배치로 묶어 한 번에 임베딩/검색"""
+        cache_key = self._cache_key("pol", query, top_k)
+        cached = await asyncio.to_thread(self._cache_get, cache_key)
+        if cached is not None:
+            return cached
+        
+        results = await self.embedding_batcher.submit((query, top_k))
         
+        await asyncio.to_thread(self._cache_set, cache_key, results)
         return results
 
-    def generate_template(self, user_input: str, business_type: str = "", message_purpose: str = "", user_id: int = 123) -> Dict:
-        """사용자 입력을 기반으로 알림톡 템플릿 생성 (새로운 형식)"""
+    async def _search_batch_async(self, requests: List[Tuple[str, int]]) -> List[List[Dict]]:
+        """배치로 모인 검색 요청을 스레드에서 실행"""
+        return await asyncio.to_thread(self._search_batch, requests)
+
+    def _search_batch(self, requests: List[Tuple[str, int]]) -> List[List[Dict]]:
+        """(query, top_k) 목록을 한 번의 임베딩과 FAISS 검색으로 처리"""
+        queries = [query for query, _ in requests]
+        
+        # 쿼리 임베딩 (정규화된 벡터를 바로 반환받아 cosine 유사도로 검색)
+        query_embeddings = self.embedding_model.encode(
+            queries,
+            batch_size=32,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ).astype('float32', copy=False)
+        
+        # 배치 내 최대 top_k로 한 번 검색한 뒤 요청별로 잘라서 사용
+        max_k = max(top_k for _, top_k in requests)
+        scores, indices = self.index.search(query_embeddings, max_k)
+        
+        # 결과 포맷팅
+        batch_results = []
+        for (_, top_k), row_scores, row_indices in zip(requests, scores, indices):
+            results = []
+            for score, idx in zip(row_scores[:top_k], row_indices[:top_k]):
+                if 0 <= idx < len(self.metadata):
+                    chunk_data = self.metadata[idx]
+                    results.append({
+                        'content': self._chunk_content(idx, chunk_data),
+                        'metadata': chunk_data['metadata'],
+                        'score': float(score)
+                    })
+            batch_results.append(results)
+        
+        return batch_results
+
+    def _chunk_content(self, idx: int, chunk_data: Dict) -> str:
+        """청크 본문 조회 (분리 저장된 경우 오프셋 구간만 디코딩)"""
+        if 'content' in chunk_data:
+            return chunk_data['content']
+        start, end = self._content_offsets[idx], self._content_offsets[idx + 1]
+        return bytes(self._contents[start:end]).decode('utf-8')
+
+    async def generate_template(self, user_input: str, business_type: str = "", message_purpose: str = "", user_id: int = 123,
+                                relevant_policies: Optional[List[Dict]] = None) -> Dict:
+        """사용자 입력을 기반으로 알림톡 템플릿 생성 (새로운 형식)
+
+        relevant_policies를 넘기면 (예: /search-policies 결과) 정책 검색을 다시 하지 않음
+        """
         
-        # 관련 정책 검색
-        search_query = f"{user_input} {business_type} {message_purpose}"
-        relevant_policies = self.search_relevant_policies(search_query)
+        # 동일한 요청으로 생성한 템플릿이 있으면 재사용 (OpenAI 호출 없음)
+        cache_key = self._template_cache_key(user_input, business_type, message_purpose, relevant_policies)
+        cached = await self._get_cached_template(cache_key, user_id)
+        if cached is not None:
+            return cached
         
-        # 정책 컨텍스트 구성
-        policy_context = self._build_policy_context(relevant_policies)
+        # 관련 정책 검색 (동시 요청과 묶어 스레드에서 배치 임베딩)
+        policy_context = await self._policy_context_for(user_input, business_type, message_purpose, relevant_policies)
         
         # OpenAI로 템플릿 생성
-        template_result = self._generate_with_openai(user_input, business_type, message_purpose, policy_context)
+        template_result = await self._generate_with_openai(user_input, business_type, message_purpose, policy_context)
+        
+        result = self._build_template_result(template_result, business_type, message_purpose, user_id)
+        
+        # OpenAI 오류로 기본 템플릿이 반환된 경우는 캐시하지 않음
+        if result["token_usage"].get('total_tokens', 0) > 0:
+            await asyncio.to_thread(self._cache_set, cache_key, result)
+        
+        return result
+
+    async def generate_template_stream(self, user_input: str, business_type: str = "", message_purpose: str = "", user_id: int = 123,
+                                       relevant_policies: Optional[List[Dict]] = None) -> AsyncIterator[Dict]:
+        """템플릿 생성 과정을 스트리밍 ("delta" 이벤트들 뒤에 최종 "result" 이벤트)"""
+        
+        cache_key = self._template_cache_key(user_input, business_type, message_purpose, relevant_policies)
+        cached = await self._get_cached_template(cache_key, user_id)
+        if cached is not None:
+            yield {"type": "result", "template": cached}
+            return
+        
+        policy_context = await self._policy_context_for(user_input, business_type, message_purpose, relevant_policies)
+        
+        template_result = None
+        async for event in self._stream_with_openai(user_input, business_type, message_purpose, policy_context):
+            if event["type"] == "delta":
+                yield event
+            else:
+                template_result = event["result"]
+        
+        result = self._build_template_result(template_result, business_type, message_purpose, user_id)
+        
+        if result["token_usage"].get('total_tokens', 0) > 0:
+            await asyncio.to_thread(self._cache_set, cache_key, result)
         
+        yield {"type": "result", "template": result}
+
+    async def _get_cached_template(self, cache_key: str, user_id: int) -> Optional[Dict]:
+        """캐시된 템플릿 조회 (캐시 응답은 토큰을 사용하지 않음)"""
+        cached = await asyncio.to_thread(self._cache_get, cache_key)
+        if cached is not None:
+            cached["userId"] = user_id
+            cached["token_usage"] = {
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'total_tokens': 0,
+                'token_cost': 0.0
+            }
+        return cached
+
+    async def _policy_context_for(self, user_input: str, business_type: str, message_purpose: str,
+                                  relevant_policies: Optional[List[Dict]]) -> str:
+        """관련 정책을 검색해 (미리 전달된 경우 그대로 사용) 프롬프트용 컨텍스트 구성"""
+        if relevant_policies is None:
+            search_query = f"{user_input} {business_type} {message_purpose}"
+            relevant_policies = await self.search_relevant_policies_async(search_query)
+        
+        return self._build_policy_context(relevant_policies)
+
+    def _build_template_result(self, template_result: Dict, business_type: str, message_purpose: str, user_id: int) -> Dict:
+        """OpenAI 결과로 API 응답 형식의 템플릿 구성"""
         # 변수 추출
         variables = self._extract_variables(template_result['template_content'])
         
@@ -86,7 +399,7 @@ class AlimTalkTemplateGenerator:
         template_code = self._generate_template_code(business_type, message_purpose)
         
         # 최종 결과 구성
-        result = {
+        return {
             "id": 1,
             "userId": user_id,
             "categoryId": 9101,  # 일반 카테고리
@@ -102,8 +415,6 @@ class AlimTalkTemplateGenerator:
             "template_code": template_code,  # 템플릿 코드를 별도 필드로 추가
             "compliance_notes": template_result['compliance_notes']  # 준수 사항을 별도 필드로 추가
         }
-        
-        return result
 
     def _determine_template_type(self, user_input: str, policies: List[Dict]) -> str:
         """사용자 입력과 정책을 기반으로 템플릿 타입 결정"""
@@ -149,8 +460,8 @@ AlimTalk Template:"""
 
         return prompt
 
-    def _generate_with_openai(self, user_input: str, business_type: str, message_purpose: str, policy_context: str) -> Dict:
-        """OpenAI API를 사용하여 템플릿 생성 (토큰 사용량 추적 포함)"""
+    def _completion_request(self, user_input: str, business_type: str, message_purpose: str, policy_context: str) -> Dict:
+        """템플릿 생성용 chat completion 요청 파라미터 구성"""
         
         prompt = f"""당신은 카카오 알림톡 템플릿 전문가입니다. 다음 요청에 따라 정책을 준수하는 알림톡 템플릿을 생성해주세요.
 
@@ -175,69 +486,120 @@ AlimTalk Template:"""
     "template_content": "실제 알림톡 템플릿 내용",
     "compliance_notes": "정책 준수 관련 참고사항"
 }}"""
+        
+        return {
+            "model": "gpt-4o-mini",
+            "messages": [
+                {"role": "system", "content": "You are an expert in KakaoTalk AlimTalk template creation, specialized in Korean business communication and compliance."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 1500
+        }
 
+    async def _generate_with_openai(self, user_input: str, business_type: str, message_purpose: str, policy_context: str) -> Dict:
+        """OpenAI API를 사용하여 템플릿 생성 (토큰 사용량 추적 포함)"""
+        
         try:
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert in KakaoTalk AlimTalk template creation, specialized in Korean business communication and compliance."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=1500
+            response = await self.openai_batcher.submit(
+                self._completion_request(user_input, business_type, message_purpose, policy_context)
             )
             
             # 토큰 사용량 추출
-            token_usage = {
-                'prompt_tokens': response.usage.prompt_tokens,
-                'completion_tokens': response.usage.completion_tokens,
-                'total_tokens': response.usage.total_tokens,
-                'token_cost': self._calculate_token_cost(response.usage)
-            }
+            token_usage = self._token_usage(response.usage)
             
             # JSON 응답 파싱
             content = response.choices[0].message.content
-            # JSON 블록 추출
-            if '```json' in content:
-                json_content = content.split('```json')[1].split('```')[0].strip()
-            elif '{' in content and '}' in content:
-                json_start = content.find('{')
-                json_end = content.rfind('}') + 1
-                json_content = content[json_start:json_end]
-            else:
-                json_content = content
+            # JSON 블록 추출 (```json 코드 블록이어도 첫 '{'부터 마지막 '}'까지가 JSON 본문)
+            match = _JSON_RE.search(content)
+            json_content = match.group(0) if match else content
             
-            result = json.loads(json_content)
+            result = orjson.loads(json_content)
             # 토큰 사용량 정보 추가
             result['token_usage'] = token_usage
             return result
             
         except Exception as e:
-            print(f"OpenAI API 오류: {e}")
+            logger.error("OpenAI API 오류: %s", e)
             # 기본 템플릿 반환 (토큰 사용량 0)
-            return {
-                "title": f"{business_type} 알림톡 템플릿",
-                "template_content": f"""안녕하세요, #{{고객명}}님.
-
-{user_input}와 관련하여 안내드립니다.
-
-#{{내용}}
-
-문의사항이 있으시면 연락 주시기 바랍니다.
-
-감사합니다.
-#{{업체명}}
-
-수신거부: #{{수신거부링크}}""",
-                "compliance_notes": "정보통신망법을 준수하여 작성된 템플릿입니다.",
-                "token_usage": {
-                    'prompt_tokens': 0,
-                    'completion_tokens': 0,
-                    'total_tokens': 0,
-                    'token_cost': 0.0
-                }
+            return self._default_template(user_input, business_type)
+    
+    async def _stream_with_openai(self, user_input: str, business_type: str, message_purpose: str, policy_context: str) -> AsyncIterator[Dict]:
+        """스트리밍으로 템플릿 생성 (JSON 객체가 닫히면 파싱, 마지막에 "result" 이벤트)"""
+        
+        try:
+            stream = await self.openai_client.chat.completions.create(
+                **self._completion_request(user_input, business_type, message_purpose, policy_context),
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            scanner = _JsonObjectScanner()
+            json_content = None
+            usage = None
+            async for chunk in stream:
+                # include_usage 사용 시 마지막 청크에 토큰 사용량이 담겨 옴
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                if json_content is not None or not chunk.choices:
+                    continue
+                
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    yield {"type": "delta", "content": delta}
+                    # 최상위 JSON 객체가 닫히면 이후 텍스트는 파싱하지 않음
+                    json_content = scanner.feed(delta)
+            
+            if json_content is None:
+                content = scanner.text
+                match = _JSON_RE.search(content)
+                json_content = match.group(0) if match else content
+            
+            result = orjson.loads(json_content)
+            result['token_usage'] = self._token_usage(usage)
+            yield {"type": "result", "result": result}
+            
+        except Exception as e:
+            logger.error("OpenAI API 오류: %s", e)
+            yield {"type": "result", "result": self._default_template(user_input, business_type)}
+    
+    def _default_template(self, user_input: str, business_type: str) -> Dict:
+        """OpenAI 호출 실패 시 사용할 기본 템플릿"""
+        return {
+            "title": f"{business_type} 알림톡 템플릿",
+            "template_content": self._DEFAULT_TEMPLATE.format_map({"user_input": user_input}),
+            "compliance_notes": "정보통신망법을 준수하여 작성된 템플릿입니다.",
+            "token_usage": {
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'total_tokens': 0,
+                'token_cost': 0.0
             }
+        }
     
+    async def _complete_batch(self, requests: List[Dict]) -> List:
+        """배치로 모인 chat completion 요청들을 동시에 실행"""
+        return await asyncio.gather(
+            *[self.openai_client.chat.completions.create(**request) for request in requests],
+            return_exceptions=True
+        )
+    
+    def _token_usage(self, usage) -> Dict:
+        """OpenAI usage 객체를 토큰 사용량 딕셔너리로 변환"""
+        if usage is None:
+            return {
+                'prompt_tokens': 0,
+                'completion_tokens': 0,
+                'total_tokens': 0,
+                'token_cost': 0.0
+            }
+        return {
+            'prompt_tokens': usage.prompt_tokens,
+            'completion_tokens': usage.completion_tokens,
+            'total_tokens': usage.total_tokens,
+            'token_cost': self._calculate_token_cost(usage)
+        }
+
     def _calculate_token_cost(self, usage) -> float:
         """GPT-4o-mini 토큰 비용 계산"""
         # GPT-4o-mini 가격 (2024년 기준)
@@ -249,12 +611,11 @@ AlimTalk Template:"""
 
     def _extract_variables(self, template_content: str) -> List[Dict]:
         """템플릿에서 변수 추출"""
-        # #{변수명} 패턴 찾기
-        pattern = r'#\{([^}]+)\}'
-        variables_found = re.findall(pattern, template_content)
+        # #{변수명} 패턴 찾기 (처음 등장한 순서대로 중복 제거)
+        variables_found = dict.fromkeys(m.group(1) for m in _VAR_RE.finditer(template_content))
         
         variables = []
-        for i, var_name in enumerate(set(variables_found), 1):
+        for i, var_name in enumerate(variables_found, 1):
             variables.append({
                 "id": i,
                 "variableKey": var_name,
@@ -334,56 +695,186 @@ AlimTalk Template:"""
         
         return max(0.0, min(1.0, score))
 
+    def get_db_connection(self):
+        """커넥션 풀에서 연결 획득 (close() 호출 시 풀로 반환, 풀이 소진되면 새 연결 생성)"""
+        if self._db_pool is None:
+            with self._db_pool_lock:
+                if self._db_pool is None:
+                    self._db_pool = pooling.MySQLConnectionPool(
+                        pool_name="alimtalk",
+                        pool_size=self.db_pool_size,
+                        **self.db_config
+                    )
+        try:
+            return self._db_pool.get_connection()
+        except errors.PoolError:
+            # 풀은 대기하지 않고 바로 실패하므로, 스레드 executor에서 동시 요청이 몰리면 일반 연결로 대체
+            logger.warning("DB connection pool exhausted (size=%d), opening a direct connection", self.db_pool_size)
+            return mysql.connector.connect(**self.db_config)
+    
     def save_to_database(self, user_input: str, business_type: str, message_purpose: str, 
                         template_result: Dict) -> int:
         """생성된 템플릿을 데이터베이스에 저장 (토큰 사용량 포함)"""
+        return self.save_many_to_database([
+            (user_input, business_type, message_purpose, template_result)
+        ])[0]
+    
+    async def save_to_database_async(self, user_input: str, business_type: str, message_purpose: str,
+                                     template_result: Dict) -> int:
+        """동시 저장 요청을 배치로 묶어 한 트랜잭션으로 저장"""
+        return await self.db_batcher.submit(
+            (user_input, business_type, message_purpose, template_result)
+        )
+    
+    async def _save_batch(self, records: List[Tuple]) -> List[int]:
+        """배치로 모인 저장 요청을 스레드에서 실행 (토큰 통계는 버퍼에 누적)"""
+        request_ids = await asyncio.to_thread(self.save_many_to_database, records, False)
+        
+        # 배치 전체가 롤백된 경우 문제 있는 요청만 실패하도록 개별 저장으로 재시도
+        if len(records) > 1 and all(request_id == -1 for request_id in request_ids):
+            request_ids = [(await asyncio.to_thread(self.save_many_to_database, [record], False))[0]
+                           for record in records]
+        
+        await self._buffer_token_stats([
+            record[3].get('token_usage', {})
+            for record, request_id in zip(records, request_ids) if request_id > 0
+        ])
+        return request_ids
+    
+    async def _buffer_token_stats(self, usages: List[Dict]):
+        """저장에 성공한 요청의 토큰 사용량을 날짜별 버퍼에 누적"""
+        if not usages:
+            return
+        
+        if self._stats_flush_task is None or self._stats_flush_task.done():
+            self._stats_flush_task = asyncio.get_running_loop().create_task(self._flush_stats_loop())
+        
+        async with self._stats_lock:
+            stats = self._stats_buffer.setdefault(date.today(), {
+                'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0, 'token_cost': 0.0, 'requests': 0
+            })
+            for token_usage in usages:
+                stats['prompt_tokens'] += token_usage.get('prompt_tokens', 0)
+                stats['completion_tokens'] += token_usage.get('completion_tokens', 0)
+                stats['total_tokens'] += token_usage.get('total_tokens', 0)
+                stats['token_cost'] += token_usage.get('token_cost', 0.0)
+                stats['requests'] += 1
+    
+    async def _flush_stats_loop(self):
+        """stats_flush_interval 초마다 버퍼를 DB에 반영"""
+        while True:
+            await asyncio.sleep(self.stats_flush_interval)
+            await self.flush_token_stats()
+    
+    async def flush_token_stats(self):
+        """버퍼에 누적된 토큰 통계를 DB에 반영 (실패 시 버퍼에 되돌림)"""
+        async with self._stats_lock:
+            snapshot, self._stats_buffer = self._stats_buffer, {}
+        
+        if not snapshot:
+            return
+        
+        try:
+            await asyncio.to_thread(self._write_token_stats, snapshot)
+        except Exception as e:
+            logger.error("Token stats flush error: %s", e)
+            async with self._stats_lock:
+                for stats_date, stats in snapshot.items():
+                    buffered = self._stats_buffer.setdefault(stats_date, dict.fromkeys(stats, 0))
+                    for key, value in stats.items():
+                        buffered[key] += value
+    
+    def _write_token_stats(self, snapshot: Dict[date, Dict]):
+        """날짜별 누적 통계를 한 연결, 한 커밋으로 반영"""
+        connection = self.get_db_connection()
+        cursor = connection.cursor()
+        try:
+            for stats_date, stats in snapshot.items():
+                self._update_daily_token_stats(cursor, stats, request_count=stats['requests'], stats_date=stats_date)
+            connection.commit()
+        except Exception:
+            # 일부 날짜만 반영되지 않도록 롤백하고, 호출자가 스냅샷을 버퍼에 되돌리도록 예외 전달
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+    
+    async def aclose(self):
+        """백그라운드 작업 종료 및 남은 토큰 통계 반영"""
+        if self._stats_flush_task is not None:
+            self._stats_flush_task.cancel()
+            try:
+                await self._stats_flush_task
+            except asyncio.CancelledError:
+                pass
+            self._stats_flush_task = None
+        
+        for batcher in (self.openai_batcher, self.embedding_batcher, self.db_batcher):
+            await batcher.close()
+        
+        await self.flush_token_stats()
+    
+    def save_many_to_database(self, records: List[Tuple], update_stats: bool = True) -> List[int]:
+        """(user_input, business_type, message_purpose, template_result) 목록을 한 트랜잭션으로 저장"""
         connection = None
         cursor = None
         
         try:
-            connection = mysql.connector.connect(**self.db_config)
+            connection = self.get_db_connection()
             cursor = connection.cursor()
             
-            # 요청 정보 저장
-            cursor.execute("""
-                INSERT INTO template_requests (user_input, business_type, message_purpose)
-                VALUES (%s, %s, %s)
-            """, (user_input, business_type, message_purpose))
-            
-            request_id = cursor.lastrowid
-            
-            # 토큰 사용량 정보 추출
-            token_usage = template_result.get('token_usage', {})
+            # 요청 정보 저장 (request_id를 받아야 하므로 행마다 INSERT)
+            request_ids = []
+            for user_input, business_type, message_purpose, _ in records:
+                cursor.execute("""
+                    INSERT INTO template_requests (user_input, business_type, message_purpose)
+                    VALUES (%s, %s, %s)
+                """, (user_input, business_type, message_purpose))
+                request_ids.append(cursor.lastrowid)
             
             # 생성된 템플릿 저장 (토큰 사용량 포함)
-            cursor.execute("""
+            template_rows = []
+            total_usage = {'prompt_tokens': 0, 'completion_tokens': 0, 'total_tokens': 0, 'token_cost': 0.0}
+            for request_id, (_, _, _, template_result) in zip(request_ids, records):
+                token_usage = template_result.get('token_usage', {})
+                template_rows.append((
+                    request_id,
+                    template_result.get('content', ''),  # 마크다운 형식 전체 콘텐츠
+                    template_result.get('type', 'MESSAGE'),
+                    1.0,  # 기본 컴플라이언스 점수
+                    orjson.dumps(template_result.get('industries', [])).decode('utf-8'),
+                    token_usage.get('prompt_tokens', 0),
+                    token_usage.get('completion_tokens', 0),
+                    token_usage.get('total_tokens', 0),
+                    token_usage.get('token_cost', 0.0)
+                ))
+                for key in total_usage:
+                    total_usage[key] += token_usage.get(key, 0)
+            
+            cursor.executemany("""
                 INSERT INTO generated_templates 
                 (request_id, template_content, template_type, compliance_score, used_policies,
                  prompt_tokens, completion_tokens, total_tokens, token_cost)
                 VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                request_id,
-                template_result.get('content', ''),  # 마크다운 형식 전체 콘텐츠
-                template_result.get('type', 'MESSAGE'),
-                1.0,  # 기본 컴플라이언스 점수
-                json.dumps(template_result.get('industries', []), ensure_ascii=False),
-                token_usage.get('prompt_tokens', 0),
-                token_usage.get('completion_tokens', 0),
-                token_usage.get('total_tokens', 0),
-                token_usage.get('token_cost', 0.0)
-            ))
+            """, template_rows)
             
-            # 일일 토큰 사용량 통계 업데이트
-            self._update_daily_token_stats(cursor, token_usage)
+            # 일일 토큰 사용량 통계 업데이트 (배치 합계로 한 번만, 버퍼 사용 시 생략)
+            if update_stats:
+                try:
+                    self._update_daily_token_stats(cursor, total_usage, request_count=len(records))
+                except Exception as e:
+                    # 통계 갱신 실패로 템플릿 저장까지 롤백하지 않음
+                    logger.error("Token stats update error: %s", e)
             
             connection.commit()
-            return request_id
+            return request_ids
             
         except Exception as e:
-            print(f"Database error: {e}")
+            logger.error("Database error: %s", e)
             if connection:
                 connection.rollback()
-            return -1
+            return [-1] * len(records)
         
         finally:
             if cursor:
@@ -391,46 +882,48 @@ AlimTalk Template:"""
             if connection:
                 connection.close()
     
-    def _update_daily_token_stats(self, cursor, token_usage: Dict):
-        """일일 토큰 사용량 통계 업데이트"""
-        try:
-            from datetime import date
-            today = date.today()
-            
-            cursor.execute("""
-                INSERT INTO token_usage_stats 
-                (date, total_requests, total_prompt_tokens, total_completion_tokens, total_tokens, total_cost)
-                VALUES (%s, 1, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                total_requests = total_requests + 1,
-                total_prompt_tokens = total_prompt_tokens + %s,
-                total_completion_tokens = total_completion_tokens + %s,
-                total_tokens = total_tokens + %s,
-                total_cost = total_cost + %s
-            """, (
-                today,
-                token_usage.get('prompt_tokens', 0),
-                token_usage.get('completion_tokens', 0),
-                token_usage.get('total_tokens', 0),
-                token_usage.get('token_cost', 0.0),
-                token_usage.get('prompt_tokens', 0),
-                token_usage.get('completion_tokens', 0),
-                token_usage.get('total_tokens', 0),
-                token_usage.get('token_cost', 0.0)
-            ))
-        except Exception as e:
-            print(f"Token stats update error: {e}")
+    def _update_daily_token_stats(self, cursor, token_usage: Dict, request_count: int = 1,
+                                  stats_date: Optional[date] = None):
+        """일일 토큰 사용량 통계 업데이트 (실패 시 예외를 호출자에게 전달)"""
+        today = stats_date or date.today()
+        
+        cursor.execute("""
+            INSERT INTO token_usage_stats 
+            (date, total_requests, total_prompt_tokens, total_completion_tokens, total_tokens, total_cost)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+            total_requests = total_requests + %s,
+            total_prompt_tokens = total_prompt_tokens + %s,
+            total_completion_tokens = total_completion_tokens + %s,
+            total_tokens = total_tokens + %s,
+            total_cost = total_cost + %s
+        """, (
+            today,
+            request_count,
+            token_usage.get('prompt_tokens', 0),
+            token_usage.get('completion_tokens', 0),
+            token_usage.get('total_tokens', 0),
+            token_usage.get('token_cost', 0.0),
+            request_count,
+            token_usage.get('prompt_tokens', 0),
+            token_usage.get('completion_tokens', 0),
+            token_usage.get('total_tokens', 0),
+            token_usage.get('token_cost', 0.0)
+        ))
 
 # 사용 예시
 if __name__ == "__main__":
+    from app.core.logging_config import setup_logging
+    setup_logging()
+    
     generator = AlimTalkTemplateGenerator()
     
     # 테스트
-    result = generator.generate_template(
+    result = asyncio.run(generator.generate_template(
         user_input="마케팅 특강 안내 메시지를 보내고 싶어요",
         business_type="교육",
         message_purpose="특강안내"
-    )
+    ))
     
     print("Generated Template (New Format):")
     print("Title:", result.get('title', 'N/A'))
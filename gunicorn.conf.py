@@ -0,0 +1,21 @@
+"""
+gunicorn 설정 파일 (Linux 배포용)
+실행: gunicorn app.api.main:app -c gunicorn.conf.py
+"""
+
+import multiprocessing
+import os
+
+# 워커마다 별도 인터프리터에서 요청을 처리해 SBERT 인코딩이 모든 코어를 사용하도록 함
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# 워커마다 FAISS/torch가 모든 코어를 쓰면 워커 수 x 코어 수만큼 스레드가 경쟁하므로 코어를 워커 수로 나눠 배정
+# (워커는 이 환경 변수를 상속받아 템플릿 생성기 초기화 시 적용)
+os.environ.setdefault("WORKER_NUM_THREADS", str(max(1, multiprocessing.cpu_count() // workers)))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 120))
+
+# 앱(FAISS 인덱스, 임베딩 모델)은 마스터에서 미리 로드하지 않고 워커마다 startup 이벤트에서 초기화
+# (OpenMP/torch 스레드 풀이 시작된 프로세스를 fork 하면 워커가 첫 병렬 연산에서 멈출 수 있음)
+preload_app = False
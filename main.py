@@ -12,8 +12,11 @@ if __name__ == "__main__":
     print("API Documentation available at: http://localhost:8000/docs")
     print("Health check at: http://localhost:8000/health")
     
+    # uvicorn[standard] 설치 시 uvloop 이벤트 루프와 httptools 파서를 사용 (Windows는 asyncio로 대체)
     uvicorn.run(
         app, 
         host="0.0.0.0", 
-        port=8000
+        port=8000,
+        loop="auto",
+        http="auto"
     )
\ No newline at end of file
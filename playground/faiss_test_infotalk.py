@@ -4,33 +4,63 @@ FAISS 벡터 DB 테스트 스크립트
 infotalk-basic.jsonl 파일을 사용하여 FAISS 인덱스 생성 및 검색 테스트
 
 필수 패키지:
-pip install faiss-cpu sentence-transformers
+pip install faiss-cpu sentence-transformers orjson
 """
 
+import argparse
 import json
 import faiss
+import hashlib
 import numpy as np
+import orjson
+import os
+import pickle
 from pathlib import Path
 from typing import List, Dict, Any, Tuple
 from sentence_transformers import SentenceTransformer
+import sys
 import time
 
+# 프로젝트 루트를 경로에 추가 (app.core.onnx_embedder 사용)
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
 class FAISSVectorDB:
     """FAISS 벡터 데이터베이스 클래스"""
     
-    def __init__(self, model_name: str = "jhgan/ko-sbert-nli"):
+    def __init__(self, model_name: str = "jhgan/ko-sbert-nli", onnx_model_dir: str = None,
+                 cache_dir: str = None):
         """
         FAISS 벡터 DB 초기화
         
         Args:
             model_name: 한국어 문장 임베딩 모델명
+            onnx_model_dir: int8 양자화 ONNX 모델 디렉토리 (지정 시 ONNX Runtime으로 임베딩)
+                            python scripts/export_onnx_embedder.py --model-name jhgan/ko-sbert-nli 로 생성
+            cache_dir: 임베딩 캐시 디렉토리 (지정 시 내용 해시가 같은 청크는 다시 인코딩하지 않음)
         """
-        print(f"임베딩 모델 로딩: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model_name = onnx_model_dir or model_name
+        if onnx_model_dir:
+            from app.core.onnx_embedder import OnnxSentenceEmbedder
+            print(f"ONNX 임베딩 모델 로딩: {onnx_model_dir}")
+            self.model = OnnxSentenceEmbedder(onnx_model_dir)
+        else:
+            print(f"임베딩 모델 로딩: {model_name}")
+            self.model = SentenceTransformer(model_name)
+        
+        # FAISS 검색/학습을 모든 코어에서 OpenMP로 병렬 실행
+        faiss.omp_set_num_threads(os.cpu_count() or 1)
+        
         self.dimension = None  # 벡터 차원 (모델 로딩 후 결정)
         self.index = None      # FAISS 인덱스
-        self.documents = []    # 원본 문서 저장
-        self.chunk_ids = []    # 청크 ID 저장
+        # 문서 필드를 필드별 배열로 저장 (검색 시 문서 dict 참조 없이 인덱싱)
+        self.contents = []     # 청크 본문
+        self.contents_arr = np.array([], dtype=object)  # 청크 본문 (search_arrays의 fancy indexing용)
+        self.sections = []     # 청크 섹션명
+        self.chunk_ids = np.array([], dtype=object)  # 청크 ID
+        self.metadatas = []    # 전체 메타데이터 (저장용, 검색 경로에서는 사용하지 않음)
+        self.nprobe = None     # IVF 계열 인덱스 탐색 클러스터 수 (None이면 max(8, nlist // 16))
+        self.multi_process_threshold = 256  # 이 개수를 넘으면 멀티 프로세스로 인코딩
+        self.cache_dir = cache_dir
         
     def load_jsonl(self, file_path: str) -> List[Dict[str, Any]]:
         """
@@ -42,25 +72,49 @@ class FAISSVectorDB:
         Returns:
             List[Dict]: 문서 청크 리스트
         """
-        documents = []
-        
         print(f"JSONL 파일 로딩: {file_path}")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    chunk = json.loads(line.strip())
-                    documents.append(chunk)
-                except json.JSONDecodeError as e:
-                    print(f"JSON 파싱 에러 (라인 {line_num}): {e}")
-                    continue
+        try:
+            # 바이너리로 읽어 orjson으로 바로 파싱 (텍스트 디코딩/strip 생략)
+            with open(file_path, 'rb') as f:
+                documents = [orjson.loads(line) for line in f if line.strip()]
+        except orjson.JSONDecodeError:
+            # 손상된 라인이 있으면 라인별로 다시 읽으며 해당 라인만 건너뜀
+            documents = []
+            with open(file_path, 'rb') as f:
+                for line_num, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        documents.append(orjson.loads(line))
+                    except orjson.JSONDecodeError as e:
+                        print(f"JSON 파싱 에러 (라인 {line_num}): {e}")
         
         print(f"총 {len(documents)}개 문서 청크 로딩 완료")
         return documents
     
+    def add_documents(self, documents: List[Dict[str, Any]]) -> List[str]:
+        """
+        문서 청크를 필드별 배열로 분해하여 저장
+        
+        Args:
+            documents: load_jsonl로 읽은 문서 청크 리스트
+            
+        Returns:
+            List[str]: 임베딩할 청크 본문 리스트
+        """
+        self.contents = [doc['content'] for doc in documents]
+        self.contents_arr = np.array(self.contents, dtype=object)
+        self.sections = [doc['metadata']['section'] for doc in documents]
+        self.chunk_ids = np.array([doc['chunk_id'] for doc in documents], dtype=object)
+        self.metadatas = [doc['metadata'] for doc in documents]
+        return self.contents
+    
     def create_embeddings(self, texts: List[str]) -> np.ndarray:
         """
         텍스트 리스트를 벡터 임베딩으로 변환
         
+        cache_dir이 지정되어 있으면 내용 해시로 캐시를 조회하여 새로 추가/변경된 텍스트만 인코딩
+        
         Args:
             texts: 임베딩할 텍스트 리스트
             
@@ -70,11 +124,10 @@ class FAISSVectorDB:
         print(f"{len(texts)}개 텍스트 임베딩 생성 중...")
         start_time = time.time()
         
-        # 문장 임베딩 생성
-        embeddings = self.model.encode(texts, show_progress_bar=True)
-        
-        # numpy 배열로 변환 및 float32 타입으로 변경 (FAISS 요구사항)
-        embeddings = np.array(embeddings, dtype=np.float32)
+        if self.cache_dir is None:
+            embeddings = self._encode_texts(texts)
+        else:
+            embeddings = self._create_embeddings_cached(texts)
         
         end_time = time.time()
         print(f"임베딩 생성 완료: {end_time - start_time:.2f}초")
@@ -82,13 +135,97 @@ class FAISSVectorDB:
         
         return embeddings
     
+    def _encode_texts(self, texts: List[str]) -> np.ndarray:
+        """모델로 텍스트를 인코딩하여 정규화된 float32 배열 반환"""
+        if len(texts) > self.multi_process_threshold and isinstance(self.model, SentenceTransformer):
+            # 대량 텍스트는 CPU 코어별 프로세스로 나누어 인코딩
+            n_workers = max(1, (os.cpu_count() or 2) // 2)
+            print(f"멀티 프로세스 인코딩 ({n_workers}개 프로세스)")
+            pool = self.model.start_multi_process_pool(['cpu'] * n_workers)
+            try:
+                embeddings = self.model.encode_multi_process(texts, pool, batch_size=32)
+            finally:
+                self.model.stop_multi_process_pool(pool)
+            
+            # encode_multi_process는 정규화 옵션이 없으므로 별도로 L2 정규화
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+            faiss.normalize_L2(embeddings)
+        else:
+            # 문장 임베딩 생성 (L2 정규화하여 내적 = cosine 유사도가 되도록 함)
+            # SentenceTransformer.encode는 내부적으로 길이순 정렬 후 배치를 만들고 원래 순서로 되돌림
+            embeddings = self.model.encode(
+                texts,
+                batch_size=64,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=True
+            )
+        
+        # numpy 배열로 변환 및 float32 타입으로 변경 (FAISS 요구사항)
+        return np.array(embeddings, dtype=np.float32)
+    
+    def _create_embeddings_cached(self, texts: List[str]) -> np.ndarray:
+        """blake2b 내용 해시 기반 .npy 캐시를 사용하여 임베딩 생성"""
+        cache_dir = Path(self.cache_dir)
+        hashes_path = cache_dir / "hashes.npy"
+        vectors_path = cache_dir / "embeddings.npy"
+        
+        # 해시는 hex 문자열로 저장 (NumPy 'S' 배열은 끝의 NUL 바이트를 잘라 바이트 다이제스트가 일치하지 않을 수 있음)
+        hashes = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest() for text in texts]
+        
+        # 기존 캐시는 mmap으로 열어 필요한 행만 읽음 (이전 바이트 형식 캐시는 버리고 새로 생성)
+        cached_hashes = np.empty(0, dtype='U32')
+        cached_vectors = None
+        if hashes_path.exists() and vectors_path.exists():
+            loaded_hashes = np.load(hashes_path)
+            if loaded_hashes.dtype.kind == 'U':
+                cached_hashes = loaded_hashes
+                cached_vectors = np.load(vectors_path, mmap_mode='r')
+        cache_pos = {h: i for i, h in enumerate(cached_hashes.tolist())}
+        
+        needed_idx = [i for i, h in enumerate(hashes) if h not in cache_pos]
+        hit_idx = [i for i, h in enumerate(hashes) if h in cache_pos]
+        print(f"임베딩 캐시: {len(hit_idx)}개 재사용, {len(needed_idx)}개 새로 인코딩")
+        
+        new_vectors = self._encode_texts([texts[i] for i in needed_idx]) if needed_idx else None
+        dimension = new_vectors.shape[1] if new_vectors is not None else cached_vectors.shape[1]
+        
+        embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+        if hit_idx:
+            embeddings[hit_idx] = cached_vectors[[cache_pos[hashes[i]] for i in hit_idx]]
+        if needed_idx:
+            embeddings[needed_idx] = new_vectors
+            
+            # 새 해시(중복 제외)를 캐시에 추가 저장
+            new_rows = {}
+            for row, i in enumerate(needed_idx):
+                new_rows.setdefault(hashes[i], row)
+            all_hashes = np.concatenate([cached_hashes, np.array(list(new_rows), dtype='U32')])
+            parts = [new_vectors[list(new_rows.values())]]
+            if cached_vectors is not None:
+                parts.insert(0, cached_vectors)
+            all_vectors = np.concatenate(parts)
+            del parts, cached_vectors  # 덮어쓰기 전에 mmap 참조 해제
+            
+            # 임시 파일에 쓴 뒤 교체하여 mmap 된 파일을 직접 잘라내지 않고, 중단돼도 기존 캐시 유지
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            for path, array in ((vectors_path, all_vectors), (hashes_path, all_hashes)):
+                tmp_path = path.with_name(path.stem + ".tmp.npy")
+                np.save(tmp_path, array)
+                os.replace(tmp_path, path)
+        
+        return embeddings
+    
     def build_index(self, embeddings: np.ndarray, index_type: str = "flat"):
         """
         FAISS 인덱스 구축
         
         Args:
             embeddings: 임베딩 벡터 배열
-            index_type: 인덱스 타입 ("flat", "ivf", "hnsw")
+            index_type: 인덱스 타입 ("flat", "ivf", "hnsw", "ivfpq")
+        
+        인덱스 타입에 따라 조정할 값이 다름: flat은 전수 탐색이라 조정값이 없고,
+        ivf/ivfpq는 self.nprobe(탐색할 클러스터 수), hnsw는 index.hnsw.efSearch로 정확도/속도 조절
         """
         self.dimension = embeddings.shape[1]
         n_vectors = embeddings.shape[0]
@@ -96,23 +233,39 @@ class FAISSVectorDB:
         print(f"FAISS 인덱스 구축 중... (타입: {index_type})")
         
         if index_type == "flat":
-            # L2 거리 기반 Flat 인덱스 (정확하지만 느림)
-            self.index = faiss.IndexFlatL2(self.dimension)
+            # 내적(cosine) 기반 Flat 인덱스 (정확하지만 느림)
+            self.index = faiss.IndexFlatIP(self.dimension)
             
         elif index_type == "ivf":
             # IVF (Inverted File) 인덱스 (빠르지만 근사치)
-            nlist = min(100, n_vectors // 4)  # 클러스터 수
-            quantizer = faiss.IndexFlatL2(self.dimension)
-            self.index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist)
+            nlist = max(1, min(100, n_vectors // 4))  # 클러스터 수
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            self.index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, faiss.METRIC_INNER_PRODUCT)
             
             # 훈련 필요 (클러스터링을 위해)
             print(f"IVF 인덱스 훈련 중... (nlist={nlist})")
             self.index.train(embeddings)
+            self.index.nprobe = self._ivf_nprobe(nlist)
+            
+        elif index_type == "ivfpq":
+            # OPQ + IVF-PQ 인덱스 (정규화 벡터의 내적 = cosine, 벡터당 PQ 코드 32바이트)
+            if n_vectors < 256:
+                # PQ 코드북(8bit = 256개 중심) 학습에 벡터가 부족하면 정확 탐색으로 대체
+                print(f"벡터 수({n_vectors})가 PQ 학습에 부족하여 Flat IP 인덱스 사용")
+                self.index = faiss.IndexFlatIP(self.dimension)
+            else:
+                nlist = max(1, min(int(4 * np.sqrt(n_vectors)), n_vectors // 39))
+                self.index = faiss.index_factory(
+                    self.dimension, f"OPQ32,IVF{nlist},PQ32x8", faiss.METRIC_INNER_PRODUCT
+                )
+                print(f"IVF-PQ 인덱스 훈련 중... (nlist={nlist})")
+                self.index.train(embeddings)
+                faiss.extract_index_ivf(self.index).nprobe = self._ivf_nprobe(nlist)
             
         elif index_type == "hnsw":
             # HNSW (Hierarchical Navigable Small World) 인덱스
             M = 16  # 연결 수
-            self.index = faiss.IndexHNSWFlat(self.dimension, M)
+            self.index = faiss.IndexHNSWFlat(self.dimension, M, faiss.METRIC_INNER_PRODUCT)
             
         else:
             raise ValueError(f"지원하지 않는 인덱스 타입: {index_type}")
@@ -123,6 +276,11 @@ class FAISSVectorDB:
         
         print(f"인덱스 구축 완료: {self.index.ntotal}개 벡터")
     
+    def _ivf_nprobe(self, nlist: int) -> int:
+        """IVF 탐색 클러스터 수 (기본값 1은 recall이 낮으므로 nlist에 비례해 설정)"""
+        nprobe = self.nprobe if self.nprobe is not None else max(8, nlist // 16)
+        return min(nprobe, nlist)
+    
     def search(self, query: str, k: int = 5) -> List[Dict[str, Any]]:
         """
         유사도 검색 수행
@@ -134,65 +292,148 @@ class FAISSVectorDB:
         Returns:
             List[Dict]: 검색 결과 리스트
         """
-        if self.index is None:
-            raise ValueError("인덱스가 구축되지 않았습니다.")
-        
         print(f"검색 쿼리: '{query}'")
+        return self.search_batch([query], k)[0]
+    
+    def search_batch(self, queries: List[str], k: int = 5) -> List[List[Dict[str, Any]]]:
+        """
+        여러 쿼리를 한 번의 임베딩과 한 번의 FAISS 검색으로 처리
         
-        # 쿼리 임베딩 생성
-        query_embedding = self.model.encode([query])
-        query_embedding = np.array(query_embedding, dtype=np.float32)
-        
-        # 유사도 검색
-        distances, indices = self.index.search(query_embedding, k)
+        Args:
+            queries: 검색 쿼리 리스트
+            k: 쿼리별 반환할 상위 결과 수
+            
+        Returns:
+            List[List[Dict]]: 쿼리 순서대로 정렬된 검색 결과 리스트
+        """
+        distances, indices = self._search(queries, k)
         
         # 결과 포맷팅
-        results = []
-        for i, (distance, idx) in enumerate(zip(distances[0], indices[0])):
-            if idx < len(self.documents):  # 유효한 인덱스 확인
-                result = {
-                    'rank': i + 1,
-                    'chunk_id': self.chunk_ids[idx],
-                    'distance': float(distance),
-                    'similarity': 1 / (1 + distance),  # 거리를 유사도로 변환
-                    'content': self.documents[idx]['content'],
-                    'metadata': self.documents[idx]['metadata']
-                }
-                results.append(result)
-        
-        return results
+        batch_results = []
+        for row_distances, row_indices in zip(distances, indices):
+            results = []
+            for i, (distance, idx) in enumerate(zip(row_distances, row_indices)):
+                if 0 <= idx < len(self.contents):  # 유효한 인덱스 확인
+                    result = {
+                        'rank': i + 1,
+                        'chunk_id': self.chunk_ids[idx],
+                        'distance': float(distance),
+                        'similarity': float(distance),
+                        'content': self.contents[idx],
+                        'section': self.sections[idx]
+                    }
+                    results.append(result)
+            batch_results.append(results)
+        
+        return batch_results
     
-    def save_index(self, index_path: str, metadata_path: str):
+    def search_arrays(self, queries: List[str], k: int = 5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        결과 dict를 만들지 않고 numpy 배열로 검색 결과 반환 (배치 후처리/재정렬용)
+        
+        Args:
+            queries: 검색 쿼리 리스트
+            k: 쿼리별 반환할 상위 결과 수
+            
+        Returns:
+            Tuple: (similarities, indices, contents) 모두 (nq, k) 배열, 결과가 없는 칸의 content는 None
+        """
+        distances, indices = self._search(queries, k)
+        
+        # 유효하지 않은 인덱스(-1)는 None으로 채우고 나머지는 fancy indexing으로 한 번에 조회
+        valid = (indices >= 0) & (indices < len(self.contents_arr))
+        contents = np.full(indices.shape, None, dtype=object)
+        contents[valid] = self.contents_arr[indices[valid]]
+        
+        return distances, indices, contents
+    
+    def _search(self, queries: List[str], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """쿼리를 한 번에 임베딩하고 FAISS 검색 결과 (distances, 행 위치) 반환"""
+        if self.index is None:
+            raise ValueError("인덱스가 구축되지 않았습니다.")
+        
+        # 쿼리 임베딩 일괄 생성 (소규모 배치이므로 진행 바 생략)
+        query_embeddings = self.model.encode(
+            queries,
+            batch_size=len(queries),
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        
+        # 유사도 검색 (nq, k), 정규화 벡터의 내적이므로 거리 = cosine 유사도
+        # FAISS는 추가 순서의 위치를 반환하므로 그대로 본문 배열의 행 위치로 사용
+        return self.index.search(query_embeddings, k)
+    
+    def save_index(self, index_path: str, metadata_path: str, human_readable: bool = False):
         """
         인덱스와 메타데이터를 파일로 저장
         
         Args:
             index_path: FAISS 인덱스 저장 경로
             metadata_path: 메타데이터 저장 경로
+            human_readable: True면 들여쓴 JSON, 기본은 pickle(protocol 5)로 저장
         """
         print(f"인덱스 저장 중: {index_path}")
         faiss.write_index(self.index, index_path)
         
         print(f"메타데이터 저장 중: {metadata_path}")
         metadata = {
-            'documents': self.documents,
+            'contents': self.contents,
+            'sections': self.sections,
             'chunk_ids': self.chunk_ids,
+            'metadatas': self.metadatas,
             'dimension': self.dimension,
-            'model_name': self.model.get_sentence_embedding_dimension()
+            'model_name': self.model_name
         }
         
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        if human_readable:
+            metadata['chunk_ids'] = self.chunk_ids.tolist()
+            with open(metadata_path, 'w', encoding='utf-8') as f:
+                json.dump(metadata, f, ensure_ascii=False, indent=2)
+        else:
+            # protocol 5는 numpy 배열 버퍼를 추가 복사 없이 직렬화
+            with open(metadata_path, 'wb') as f:
+                pickle.dump(metadata, f, protocol=5)
         
         print("저장 완료")
+    
+    def load_index(self, index_path: str, metadata_path: str):
+        """
+        save_index로 저장한 인덱스와 메타데이터 로딩 (.json이면 JSON, 그 외는 pickle)
+        
+        Args:
+            index_path: FAISS 인덱스 파일 경로
+            metadata_path: 메타데이터 파일 경로
+        """
+        print(f"인덱스 로딩 중: {index_path}")
+        self.index = faiss.read_index(index_path)
+        
+        print(f"메타데이터 로딩 중: {metadata_path}")
+        if Path(metadata_path).suffix == '.json':
+            metadata = orjson.loads(Path(metadata_path).read_bytes())
+        else:
+            with open(metadata_path, 'rb') as f:
+                metadata = pickle.load(f)
+        
+        self.contents = metadata['contents']
+        self.contents_arr = np.array(self.contents, dtype=object)
+        self.sections = metadata['sections']
+        self.chunk_ids = np.asarray(metadata['chunk_ids'], dtype=object)
+        self.metadatas = metadata['metadatas']
+        self.dimension = metadata['dimension']
+        
+        print(f"로딩 완료: {self.index.ntotal}개 벡터")
 
 
-def main():
+def main(human_readable: bool = False):
     """메인 테스트 함수"""
     print("=== FAISS 벡터 DB 테스트 시작 ===\n")
     
     # 1. FAISS 벡터 DB 초기화
-    vector_db = FAISSVectorDB(model_name="jhgan/ko-sbert-nli")
+    vector_db = FAISSVectorDB(model_name="jhgan/ko-sbert-nli",
+                              cache_dir="playground/embedding_cache/ko-sbert-nli")
     
     # 2. JSONL 파일 로딩
     jsonl_path = "data/cleaned_v4/infotalk-basic.jsonl"
@@ -207,15 +448,7 @@ def main():
     
     # 3. 문서 데이터 준비
     print("\n문서 데이터 준비 중...")
-    texts = []
-    chunk_ids = []
-    
-    for doc in documents:
-        texts.append(doc['content'])
-        chunk_ids.append(doc['chunk_id'])
-        vector_db.documents.append(doc)
-    
-    vector_db.chunk_ids = chunk_ids
+    texts = vector_db.add_documents(documents)
     
     # 4. 임베딩 생성
     print("\n=== 임베딩 생성 ===")
@@ -235,9 +468,12 @@ def main():
         "카카오톡 채널 개설 방법"
     ]
     
-    for query in test_queries:
+    # 모든 테스트 쿼리를 한 번에 임베딩/검색
+    batch_results = vector_db.search_batch(test_queries, k=3)
+    
+    for query, results in zip(test_queries, batch_results):
         print(f"\n{'='*50}")
-        results = vector_db.search(query, k=3)
+        print(f"검색 쿼리: '{query}'")
         
         if results:
             print(f"상위 {len(results)}개 검색 결과:")
@@ -245,7 +481,7 @@ def main():
                 print(f"\n[{result['rank']}위] 청크 ID: {result['chunk_id']}")
                 print(f"유사도: {result['similarity']:.4f}")
                 print(f"내용: {result['content'][:100]}...")
-                print(f"섹션: {result['metadata']['section'][:50]}...")
+                print(f"섹션: {result['section'][:50]}...")
         else:
             print("검색 결과가 없습니다.")
     
@@ -254,14 +490,14 @@ def main():
     save_option = input("인덱스를 저장하시겠습니까? (y/n): ").strip().lower()
     if save_option == 'y':
         index_path = "playground/infotalk_faiss.index"
-        metadata_path = "playground/infotalk_metadata.json"
-        vector_db.save_index(index_path, metadata_path)
+        metadata_path = "playground/infotalk_metadata.json" if human_readable else "playground/infotalk_metadata.pkl"
+        vector_db.save_index(index_path, metadata_path, human_readable=human_readable)
     
     # 8. 성능 정보 출력
     print(f"\n=== 성능 정보 ===")
     print(f"총 문서 수: {len(documents)}")
     print(f"임베딩 차원: {embeddings.shape[1]}")
-    print(f"인덱스 타입: Flat L2")
+    print(f"인덱스 타입: Flat IP (cosine)")
     print(f"모델: jhgan/ko-sbert-nli")
     
     print("\n=== 테스트 완료 ===")
@@ -279,4 +515,9 @@ if __name__ == "__main__":
         print("pip install faiss-cpu sentence-transformers")
         exit(1)
     
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="FAISS 벡터 DB 테스트")
+    parser.add_argument("--human-readable", action="store_true",
+                        help="메타데이터를 pickle 대신 들여쓴 JSON으로 저장")
+    args = parser.parse_args()
+    
+    main(human_readable=args.human_readable)
\ No newline at end of file
@@ -7,28 +7,44 @@ RAG 시스템을 위한 문서 정리 및 정제
 import re
 import html
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 
+# 1~2. GitBook 마크업 / HTML 태그 제거 (한 번의 스캔으로 처리)
+# <mark>는 일반 태그 패턴이 여닫는 태그를 지우면 내용만 남으므로 별도 패턴이 필요 없음
+_MARKUP_RE = re.compile('|'.join([
+    r'\{% (?:hint|tabs?|endtabs?|content-ref).*?%\}',
+    r'\{% (?:endhint|endcontent-ref) %\}',
+    r'(?s:<figure>.*?</figure>)',
+    r'(?s:<figcaption>.*?</figcaption>)',
+    r'<[^>]+>',
+]))
+
+# 4. GitBook 마크다운 링크 (뒤의 URL 패턴이 링크를 넘어 매칭되지 않도록 먼저 제거)
+_GITBOOK_LINK_RE = re.compile(r'\[.*?\]\(https://.*?gitbook\.io.*?\)')
+
+# 4~5. GitBook URL / 불필요한 문자열 제거 (한 번의 스캔으로 처리)
+# '?alt=media...token=' 은 뒤쪽 'alt=...token=' 패턴이 먼저 지우던 것과 같도록 별도 패턴을 두지 않음
+_LINK_RE = re.compile('|'.join([
+    r'https://.*?gitbook\.io[^\s\)]*',
+    r'alt=.*?token=[^\s"]*',
+    r'files\.gitbook\.io[^\s]*',
+]))
+
+# 6. 연속된 빈 줄 (3개 이상)
+_BLANK_LINES_RE = re.compile(r'\n\n\n+')
+
+# 7. 특수 문자
+_SPECIAL_CHARS_RE = re.compile(r'[◀▶►☞]')
+
+
 def clean_markdown_content(content):
     """마크다운 콘텐츠 정리"""
     
     # 1. GitBook 마크업 제거
-    content = re.sub(r'\{% hint.*?%\}', '', content, flags=re.MULTILINE)
-    content = re.sub(r'\{% endhint %\}', '', content)
-    content = re.sub(r'\{% tabs.*?%\}', '', content)
-    content = re.sub(r'\{% tab.*?%\}', '', content)
-    content = re.sub(r'\{% endtab.*?%\}', '', content)
-    content = re.sub(r'\{% endtabs.*?%\}', '', content)
-    content = re.sub(r'\{% content-ref.*?%\}', '', content)
-    content = re.sub(r'\{% endcontent-ref %\}', '', content)
-    
     # 2. HTML 태그 제거
-    content = re.sub(r'<figure>.*?</figure>', '', content, flags=re.DOTALL)
-    content = re.sub(r'<figcaption>.*?</figcaption>', '', content, flags=re.DOTALL)
-    content = re.sub(r'<img[^>]*>', '', content)
-    content = re.sub(r'<mark[^>]*>(.*?)</mark>', r'\1', content)
-    content = re.sub(r'<[^>]+>', '', content)
+    content = _MARKUP_RE.sub('', content)
     
     # 3. HTML 엔티티 디코딩
     content = html.unescape(content)
@@ -40,19 +56,15 @@ def clean_markdown_content(content):
     content = content.replace('\\)', ')')
     
     # 4. GitBook 링크 패턴 제거
-    content = re.sub(r'\[.*?\]\(https://.*?gitbook\.io.*?\)', '', content)
-    content = re.sub(r'https://.*?gitbook\.io[^\s\)]*', '', content)
-    
     # 5. 불필요한 문자열 제거
-    content = re.sub(r'alt=.*?token=[^\s"]*', '', content)
-    content = re.sub(r'\?alt=media.*?token=[^\s"]*', '', content)
-    content = re.sub(r'files\.gitbook\.io[^\s]*', '', content)
+    content = _GITBOOK_LINK_RE.sub('', content)
+    content = _LINK_RE.sub('', content)
     
     # 6. 연속된 빈 줄 정리 (3개 이상의 연속 빈 줄을 2개로)
-    content = re.sub(r'\n\n\n+', '\n\n', content)
+    content = _BLANK_LINES_RE.sub('\n\n', content)
     
     # 7. 특수 문자 정리
-    content = re.sub(r'[◀▶►☞]', '', content)
+    content = _SPECIAL_CHARS_RE.sub('', content)
     
     # 8. 앞뒤 공백 제거
     content = content.strip()
@@ -80,6 +92,12 @@ def preprocess_policy_file(input_path, output_path):
         print(f"[ERROR] 전처리 실패: {input_path.name} - {str(e)}")
 
 
+def _process_one(args):
+    """프로세스 풀에서 실행할 단일 파일 전처리 (pickle 가능한 최상위 함수)"""
+    input_path, output_path = args
+    preprocess_policy_file(input_path, output_path)
+
+
 def main():
     """메인 실행 함수"""
     # 경로 설정
@@ -99,9 +117,10 @@ def main():
     print(f"[INFO] {len(md_files)}개의 정책 문서 전처리 시작...")
     print("-" * 50)
     
-    for md_file in md_files:
-        output_file = cleaned_dir / md_file.name
-        preprocess_policy_file(md_file, output_file)
+    # 파일별 전처리는 서로 독립적이므로 CPU 코어 수만큼 병렬 실행
+    jobs = [(md_file, cleaned_dir / md_file.name) for md_file in md_files]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        list(executor.map(_process_one, jobs))
     
     print("-" * 50)
     print(f"[SUCCESS] 전처리 완료! {len(md_files)}개 파일이 data/cleaned/ 폴더에 저장되었습니다.")
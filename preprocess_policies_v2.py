@@ -1,17 +1,59 @@
 import os
 import re
 import json
-from typing import List, Dict, Any
+from collections import Counter
+from typing import List, Dict, Any, Tuple
 from pathlib import Path
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 내용에서 자주 언급되는지 확인할 공통 키워드
+_COMMON_KEYWORDS = ["알림톡", "템플릿", "메시지", "발송", "심사", "승인", "가이드"]
+
+# 공통 키워드를 한 번의 선형 스캔으로 세기 위한 Aho-Corasick 오토마톤 (설치된 경우)
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = ahocorasick.Automaton()
+    for _keyword in _COMMON_KEYWORDS:
+        _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+    _KEYWORD_AUTOMATON.make_automaton()
+else:
+    _KEYWORD_AUTOMATON = None
+
+# 섹션 헤더 패턴 (#, ##, ### 로 시작하는 제목, 한 줄 안에서만 매칭)
+_HEADER_RE = re.compile(r'^(#{1,3})[^\S\n]+(.+)$', re.MULTILINE)
+
+
+def _parse_document(content: str) -> Tuple[List[Tuple[int, str]], List[Tuple[str, int, int, int]]]:
+    """헤더를 한 번만 스캔하여 메타데이터용 헤더 목록과 청킹용 섹션 구간을 함께 반환
+
+    Returns:
+        headers: (level, title) 목록
+        section_slices: (title, level, start, end) 목록 (첫 헤더 이전 구간 포함)
+    """
+    matches = [(m.start(), len(m.group(1)), m.group(2).strip()) for m in _HEADER_RE.finditer(content)]
+    
+    headers = [(level, title) for _, level, title in matches]
+    
+    boundaries = [start for start, _, _ in matches] + [len(content)]
+    section_slices = [("", 1, 0, boundaries[0])]
+    section_slices += [(title, level, start, boundaries[i + 1]) for i, (start, level, title) in enumerate(matches)]
+    
+    return headers, section_slices
+
 class PolicyPreprocessor:
     def __init__(self, input_dir: str = "data/policies_v2", output_dir: str = "data/cleaned_v2"):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-    def extract_metadata(self, content: str, filename: str) -> Dict[str, Any]:
-        """파일 내용에서 메타데이터를 추출합니다."""
+    def extract_metadata(self, content: str, filename: str, headers: List[Tuple[int, str]] = None) -> Dict[str, Any]:
+        """파일 내용에서 메타데이터를 추출합니다. (headers는 _parse_document 결과 재사용)"""
+        if headers is None:
+            headers, _ = _parse_document(content)
+        
         metadata = {
             "source_file": filename,
             "total_length": len(content),
@@ -21,13 +63,10 @@ class PolicyPreprocessor:
         }
         
         # 섹션 헤더 추출 (## 또는 ### 로 시작하는 제목들)
-        section_pattern = r'^(#{1,3})\s+(.+)$'
-        sections = re.findall(section_pattern, content, re.MULTILINE)
-        
-        for level, title in sections:
+        for level, title in headers:
             metadata["sections"].append({
-                "level": len(level),
-                "title": title.strip(),
+                "level": level,
+                "title": title,
                 "type": self._classify_section_type(title)
             })
         
@@ -98,21 +137,25 @@ class PolicyPreprocessor:
                 break
         
         # 내용에서 자주 언급되는 키워드 추가
-        common_keywords = ["알림톡", "템플릿", "메시지", "발송", "심사", "승인", "가이드"]
-        for keyword in common_keywords:
-            if keyword in content and keyword not in topics:
-                keyword_count = content.count(keyword)
-                if keyword_count > 3:  # 3번 이상 언급된 키워드만 추가
-                    topics.append(keyword)
+        if _KEYWORD_AUTOMATON is not None:
+            # 겹쳐서 나타날 수 없는 키워드들이므로 str.count와 같은 횟수
+            keyword_counts = Counter(keyword for _, keyword in _KEYWORD_AUTOMATON.iter(content))
+        else:
+            keyword_counts = {keyword: content.count(keyword) for keyword in _COMMON_KEYWORDS}
+        
+        for keyword in _COMMON_KEYWORDS:
+            if keyword not in topics and keyword_counts.get(keyword, 0) > 3:  # 3번 이상 언급된 키워드만 추가
+                topics.append(keyword)
         
         return list(set(topics))  # 중복 제거
     
-    def chunk_content(self, content: str, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """내용을 적절한 크기로 청킹합니다."""
+    def chunk_content(self, content: str, metadata: Dict[str, Any],
+                      section_slices: List[Tuple[str, int, int, int]] = None) -> List[Dict[str, Any]]:
+        """내용을 적절한 크기로 청킹합니다. (section_slices는 _parse_document 결과 재사용)"""
         chunks = []
         
         # 섹션별로 분할
-        sections = self._split_by_sections(content)
+        sections = self._split_by_sections(content, section_slices)
         
         for i, section in enumerate(sections):
             section_content = section["content"].strip()
@@ -147,38 +190,25 @@ class PolicyPreprocessor:
         
         return chunks
     
-    def _split_by_sections(self, content: str) -> List[Dict[str, Any]]:
+    def _split_by_sections(self, content: str,
+                           section_slices: List[Tuple[str, int, int, int]] = None) -> List[Dict[str, Any]]:
         """내용을 섹션별로 분할합니다."""
         sections = []
         
-        # 헤더 패턴으로 분할
-        section_pattern = r'^(#{1,3})\s+(.+)$'
-        lines = content.split('\n')
-        
-        current_section = {"title": "", "content": "", "level": 1}
+        # 헤더 위치로 내용을 잘라 섹션 구성 (줄 단위 순회 없이 한 번의 스캔 결과 사용)
+        if section_slices is None:
+            _, section_slices = _parse_document(content)
         
-        for line in lines:
-            header_match = re.match(section_pattern, line)
-            
-            if header_match:
-                # 이전 섹션 저장
-                if current_section["content"].strip():
-                    sections.append(current_section.copy())
-                
-                # 새 섹션 시작
-                level = len(header_match.group(1))
-                title = header_match.group(2).strip()
-                current_section = {
+        for i, (title, level, start, end) in enumerate(section_slices):
+            section_content = content[start:end]
+            if i == len(section_slices) - 1:
+                section_content += '\n'
+            if section_content.strip():
+                sections.append({
                     "title": title,
-                    "content": line + '\n',
+                    "content": section_content,
                     "level": level
-                }
-            else:
-                current_section["content"] += line + '\n'
-        
-        # 마지막 섹션 저장
-        if current_section["content"].strip():
-            sections.append(current_section)
+                })
         
         return sections
     
@@ -189,20 +219,29 @@ class PolicyPreprocessor:
         # 단락별로 먼저 분할
         paragraphs = [p.strip() for p in content.split('\n\n') if p.strip()]
         
-        current_chunk = f"{'#' * level} {title}\n\n"
+        header = f"{'#' * level} {title}"
+        
+        # 단락은 리스트에 모으고 길이만 누적하다가 청크를 내보낼 때 한 번만 합침
+        current_parts = [header]
+        current_length = len(header) + 2
+        
+        def emit_chunk():
+            chunk = '\n\n'.join(current_parts).strip()
+            if len(chunk) > len(header):
+                chunks.append(chunk)
         
         for paragraph in paragraphs:
             # 청크가 너무 길어지면 새로운 청크 시작
-            if len(current_chunk + paragraph) > 1200:
-                if len(current_chunk.strip()) > len(f"{'#' * level} {title}"):
-                    chunks.append(current_chunk.strip())
-                current_chunk = f"{'#' * level} {title}\n\n{paragraph}\n\n"
+            if current_length + len(paragraph) > 1200:
+                emit_chunk()
+                current_parts = [header, paragraph]
+                current_length = len(header) + len(paragraph) + 4
             else:
-                current_chunk += paragraph + '\n\n'
+                current_parts.append(paragraph)
+                current_length += len(paragraph) + 2
         
         # 마지막 청크 추가
-        if len(current_chunk.strip()) > len(f"{'#' * level} {title}"):
-            chunks.append(current_chunk.strip())
+        emit_chunk()
         
         return chunks if chunks else [content]
     
@@ -213,11 +252,14 @@ class PolicyPreprocessor:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
+        # 헤더 스캔은 한 번만 하고 메타데이터/청킹에서 결과 공유
+        headers, section_slices = _parse_document(content)
+        
         # 메타데이터 추출
-        metadata = self.extract_metadata(content, file_path.name)
+        metadata = self.extract_metadata(content, file_path.name, headers)
         
         # 청킹
-        chunks = self.chunk_content(content, metadata)
+        chunks = self.chunk_content(content, metadata, section_slices)
         
         result = {
             "source_file": file_path.name,
@@ -1,48 +1,94 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, errorcode, pooling
 import os
 from dotenv import load_dotenv
 
 # .env 파일 로드
 load_dotenv()
 
-def add_token_usage_columns():
-    """generated_templates 테이블에 토큰 사용량 컬럼 추가"""
-    
-    # MySQL 연결 설정 (.env 파일에서 로드)
-    config = {
+# 서비스/CI 루프에서 반복 호출될 때 연결 핸드셰이크를 재사용하기 위한 커넥션 풀 (첫 사용 시 생성)
+_POOL = None
+
+def _db_config():
+    """MySQL 연결 설정 (.env 파일에서 로드)"""
+    return {
         'host': os.getenv('DB_HOST', 'localhost'),
         'user': os.getenv('DB_USER', 'steve'),
         'password': os.getenv('DB_PASSWORD', 'doolman'),
         'database': os.getenv('DB_NAME', 'alimtalk_ai'),
         'charset': os.getenv('DB_CHARSET', 'utf8mb4')
     }
+
+def _get_connection(config, use_pool=True):
+    """풀에서 연결을 가져오거나 (use_pool=False면) 직접 연결"""
+    global _POOL
+    if not use_pool:
+        return mysql.connector.connect(**config)
+    if _POOL is None:
+        _POOL = pooling.MySQLConnectionPool(pool_name='alim', pool_size=4, **config)
+    return _POOL.get_connection()
+
+# ALGORITHM=INSTANT를 쓸 수 없을 때의 오류 (이 경우에만 INPLACE로 재시도)
+_INSTANT_UNSUPPORTED = (
+    errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED,
+    errorcode.ER_ALTER_OPERATION_NOT_SUPPORTED_REASON,
+    errorcode.ER_UNKNOWN_ALTER_ALGORITHM,  # INSTANT가 없는 MySQL 5.7 이하
+)
+
+def _alter_table(cursor, alter_sql):
+    """INSTANT로 ALTER 실행, 지원되지 않는 경우에만 테이블 잠금 없는 INPLACE로 재시도"""
+    try:
+        cursor.execute(alter_sql + ", ALGORITHM=INSTANT")
+    except Error as e:
+        if e.errno not in _INSTANT_UNSUPPORTED:
+            raise
+        print(f"ALGORITHM=INSTANT not available ({e}), retrying with INPLACE")
+        cursor.execute(alter_sql + ", ALGORITHM=INPLACE, LOCK=NONE")
+
+def add_token_usage_columns(use_pool=True):
+    """generated_templates 테이블에 토큰 사용량 컬럼 추가 (단발 CLI 실행은 use_pool=False)"""
+    
+    # MySQL 연결 설정 (.env 파일에서 로드)
+    config = _db_config()
     
     connection = None
     cursor = None
     
     try:
         # MySQL 서버에 연결
-        connection = mysql.connector.connect(**config)
+        connection = _get_connection(config, use_pool)
         cursor = connection.cursor()
         
         # 토큰 사용량 컬럼들 추가
-        columns_to_add = [
-            "ADD COLUMN prompt_tokens INT DEFAULT 0 COMMENT '프롬프트 토큰 수'",
-            "ADD COLUMN completion_tokens INT DEFAULT 0 COMMENT '생성된 토큰 수'", 
-            "ADD COLUMN total_tokens INT DEFAULT 0 COMMENT '총 토큰 수'",
-            "ADD COLUMN token_cost DECIMAL(10,6) DEFAULT 0.000000 COMMENT '토큰 비용 (USD)'"
-        ]
+        columns_to_add = {
+            "prompt_tokens": "ADD COLUMN prompt_tokens INT DEFAULT 0 COMMENT '프롬프트 토큰 수'",
+            "completion_tokens": "ADD COLUMN completion_tokens INT DEFAULT 0 COMMENT '생성된 토큰 수'",
+            "total_tokens": "ADD COLUMN total_tokens INT DEFAULT 0 COMMENT '총 토큰 수'",
+            "token_cost": "ADD COLUMN token_cost DECIMAL(10,6) DEFAULT 0.000000 COMMENT '토큰 비용 (USD)'"
+        }
+        
+        # 이미 존재하는 컬럼은 제외
+        cursor.execute("SHOW COLUMNS FROM generated_templates")
+        existing_columns = {row[0] for row in cursor.fetchall()}
+        for name in columns_to_add.keys() & existing_columns:
+            print(f"Column already exists: {name}")
+        missing = [ddl for name, ddl in columns_to_add.items() if name not in existing_columns]
         
-        for column in columns_to_add:
+        if missing:
+            # 한 번의 ALTER로 모든 컬럼 추가 (MySQL 8.0+ 은 메타데이터만 변경하는 INSTANT)
             try:
-                cursor.execute(f"ALTER TABLE generated_templates {column}")
-                print(f"Added column: {column}")
+                _alter_table(cursor, "ALTER TABLE generated_templates " + ", ".join(missing))
+                for ddl in missing:
+                    print(f"Added column: {ddl}")
             except Error as e:
-                if "Duplicate column name" in str(e):
-                    print(f"Column already exists: {column}")
-                else:
-                    print(f"Error adding column {column}: {e}")
+                # 한 번에 추가하지 못하면 컬럼별로 다시 시도해 실패한 컬럼만 보고하고 계속 진행
+                print(f"Batched ALTER failed ({e}), adding columns one by one")
+                for ddl in missing:
+                    try:
+                        _alter_table(cursor, f"ALTER TABLE generated_templates {ddl}")
+                        print(f"Added column: {ddl}")
+                    except Error as column_error:
+                        print(f"Error adding column {ddl}: {column_error}")
         
         # 토큰 사용량 통계 테이블 생성
         cursor.execute("""
@@ -75,4 +121,5 @@ def add_token_usage_columns():
             connection.close()
 
 if __name__ == "__main__":
-    add_token_usage_columns()
\ No newline at end of file
+    # 단발성 CLI 실행은 풀 없이 직접 연결
+    add_token_usage_columns(use_pool=False)
\ No newline at end of file
@@ -1,37 +1,74 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
 import os
 from dotenv import load_dotenv
 
 # .env 파일 로드
 load_dotenv()
 
-def check_database_data():
-    """데이터베이스 테이블의 데이터 상태 확인"""
-    
-    # MySQL 연결 설정 (.env 파일에서 로드)
-    config = {
+# 서비스/CI 루프에서 반복 호출될 때 연결 핸드셰이크를 재사용하기 위한 커넥션 풀 (첫 사용 시 생성)
+_POOL = None
+
+def _db_config():
+    """MySQL 연결 설정 (.env 파일에서 로드)"""
+    return {
         'host': os.getenv('DB_HOST', 'localhost'),
         'user': os.getenv('DB_USER', 'steve'),
         'password': os.getenv('DB_PASSWORD', 'doolman'),
         'database': os.getenv('DB_NAME', 'alimtalk_ai'),
         'charset': os.getenv('DB_CHARSET', 'utf8mb4')
     }
+
+def _get_connection(config, use_pool=True):
+    """풀에서 연결을 가져오거나 (use_pool=False면) 직접 연결"""
+    global _POOL
+    if not use_pool:
+        return mysql.connector.connect(**config)
+    if _POOL is None:
+        _POOL = pooling.MySQLConnectionPool(pool_name='alim', pool_size=4, **config)
+    return _POOL.get_connection()
+
+def _fetch_table_counts(cursor, database, approximate=False):
+    """세 테이블의 행 수를 한 번의 쿼리로 조회 (approximate=True면 information_schema 추정치)"""
+    if approximate:
+        # InnoDB 통계 기반 추정치 (테이블 스캔 없이 즉시 반환)
+        cursor.execute("""
+            SELECT table_name AS table_name, table_rows AS count
+            FROM information_schema.tables
+            WHERE table_schema = %s
+              AND table_name IN ('template_requests', 'generated_templates', 'token_usage_stats')
+        """, (database,))
+        return {row['table_name']: row['count'] for row in cursor.fetchall()}
+    
+    cursor.execute("""
+        SELECT
+            (SELECT COUNT(*) FROM template_requests) AS template_requests,
+            (SELECT COUNT(*) FROM generated_templates) AS generated_templates,
+            (SELECT COUNT(*) FROM token_usage_stats) AS token_usage_stats
+    """)
+    return cursor.fetchone()
+
+def check_database_data(approximate=False, use_pool=True):
+    """데이터베이스 테이블의 데이터 상태 확인 (단발 CLI 실행은 use_pool=False)"""
+    
+    # MySQL 연결 설정 (.env 파일에서 로드)
+    config = _db_config()
     
     connection = None
     cursor = None
     
     try:
         # MySQL 서버에 연결
-        connection = mysql.connector.connect(**config)
+        connection = _get_connection(config, use_pool)
         cursor = connection.cursor(dictionary=True)
         
         print("=== Database Connection Success ===")
         
+        # 테이블별 행 수 확인 (한 번의 왕복)
+        counts = _fetch_table_counts(cursor, config['database'], approximate)
+        
         # template_requests 테이블 확인
-        cursor.execute("SELECT COUNT(*) as count FROM template_requests")
-        requests_count = cursor.fetchone()
-        print(f"template_requests table count: {requests_count['count']}")
+        print(f"template_requests table count: {counts.get('template_requests')}")
         
         # 최근 요청 5개 확인
         cursor.execute("SELECT * FROM template_requests ORDER BY created_at DESC LIMIT 5")
@@ -45,9 +82,7 @@ def check_database_data():
             print("\nNo requests found!")
         
         # generated_templates 테이블 확인
-        cursor.execute("SELECT COUNT(*) as count FROM generated_templates")
-        templates_count = cursor.fetchone()
-        print(f"\ngenerated_templates table count: {templates_count['count']}")
+        print(f"\ngenerated_templates table count: {counts.get('generated_templates')}")
         
         # 최근 템플릿 5개 확인
         cursor.execute("""
@@ -69,9 +104,7 @@ def check_database_data():
             print("\nNo templates found!")
         
         # token_usage_stats 테이블 확인
-        cursor.execute("SELECT COUNT(*) as count FROM token_usage_stats")
-        stats_count = cursor.fetchone()
-        print(f"\ntoken_usage_stats table count: {stats_count['count']}")
+        print(f"\ntoken_usage_stats table count: {counts.get('token_usage_stats')}")
         
         # 최근 통계 확인
         cursor.execute("SELECT * FROM token_usage_stats ORDER BY date DESC LIMIT 3")
@@ -102,4 +135,12 @@ def check_database_data():
             connection.close()
 
 if __name__ == "__main__":
-    check_database_data()
\ No newline at end of file
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Check database table data")
+    parser.add_argument("--approximate", action="store_true",
+                        help="information_schema 추정 행 수 사용 (대용량 테이블에서 COUNT(*) 생략)")
+    args = parser.parse_args()
+    
+    # 단발성 CLI 실행은 풀 없이 직접 연결
+    check_database_data(approximate=args.approximate, use_pool=False)
\ No newline at end of file
@@ -1,72 +1,225 @@
-import json
 import faiss
+import hashlib
+import itertools
+import mmap
 import numpy as np
+import orjson
+import torch
+import torch.multiprocessing as mp
 from sentence_transformers import SentenceTransformer
 import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치 시 parquet 내보내기 생략
+    pa = None
+
+# app 패키지(ONNX 인코더) import를 위해 프로젝트 루트 추가
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+def _load_jsonl(file_path):
+    """JSONL 파일 하나를 mmap으로 읽어 청크 리스트로 파싱 (빈 줄은 건너뜀)"""
+    print(f"Loading {file_path.name}...")
+    with open(file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        # 버퍼 복사 없이 페이지 캐시에서 한 줄씩 읽고, orjson은 끝의 개행을 그대로 받음
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [orjson.loads(line) for line in iter(mm.readline, b"") if line.strip()]
+
 def load_all_chunks():
     """모든 JSONL 파일에서 청크 데이터 로드"""
     data_dir = Path("data/cleaned_v4")
-    all_chunks = []
     
     jsonl_files = list(data_dir.glob("*.jsonl"))
+    if not jsonl_files:
+        return []
+    
+    # 파일 IO 대기를 겹치도록 스레드로 병렬 로드 (map은 파일 순서를 유지)
+    with ThreadPoolExecutor(max_workers=min(8, len(jsonl_files))) as executor:
+        per_file = list(executor.map(_load_jsonl, jsonl_files))
     
-    for file_path in jsonl_files:
-        print(f"Loading {file_path.name}...")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                chunk = json.loads(line.strip())
-                all_chunks.append(chunk)
+    return list(itertools.chain.from_iterable(per_file))
+
+# GPU 인덱스가 사용하는 FAISS GPU 리소스 (인덱스보다 오래 살아 있도록 모듈 전역으로 유지)
+_gpu_resources = None
+
+def _index_to_gpu(index):
+    """CPU 인덱스를 0번 GPU로 복사 (전수 내적 계산을 GPU 메모리 대역폭으로 처리)"""
+    global _gpu_resources
+    if _gpu_resources is None:
+        _gpu_resources = faiss.StandardGpuResources()
+        _gpu_resources.setTempMemory(1024 * 1024 * 1024)
+    return faiss.index_cpu_to_gpu(_gpu_resources, 0, index)
+
+# 인코딩 워커 프로세스가 공유하는 모델 (워커 초기화 시 설정)
+_worker_model = None
+
+def _init_encode_worker(model, num_threads):
+    """인코딩 워커 초기화: 공유 메모리의 모델을 전역으로 보관하고 스레드 수를 나눠 가짐"""
+    global _worker_model
+    torch.set_num_threads(num_threads)
+    _worker_model = model
+
+def _encode_shard(texts, batch_size):
+    """워커에서 텍스트 묶음 하나를 정규화된 임베딩으로 변환"""
+    with torch.inference_mode():
+        return _worker_model.encode(
+            texts,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+def _encode_parallel(model, texts, batch_size, num_workers):
+    """CPU 인코딩을 여러 프로세스로 나눠 실행 (모델 가중치는 공유 메모리에 한 벌만 둠)"""
+    model.share_memory()
+    shard_size = -(-len(texts) // (num_workers * 4))
+    shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+    num_threads = max(1, (os.cpu_count() or 1) // num_workers)
     
-    return all_chunks
+    # fork된 프로세스에서 torch 스레드 풀이 꼬이지 않도록 spawn 컨텍스트 사용
+    with mp.get_context('spawn').Pool(num_workers, initializer=_init_encode_worker,
+                                       initargs=(model, num_threads)) as pool:
+        parts = pool.map(partial(_encode_shard, batch_size=batch_size), shards)
+    return np.concatenate(parts)
 
-def create_faiss_index(chunks, model_name='sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'):
-    """FAISS 인덱스 생성"""
-    print(f"Loading sentence transformer model: {model_name}")
-    model = SentenceTransformer(model_name)
+def create_faiss_index(chunks, model_name='sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2', index_type="hnsw",
+                       batch_size=256, onnx_model_dir=None, num_workers=1):
+    """FAISS 인덱스 생성 (index_type: "flat", "hnsw" 또는 "ivf", onnx_model_dir 지정 시 int8 ONNX 인코더 사용)"""
+    if onnx_model_dir:
+        # scripts/export_onnx_embedder.py 로 내보낸 int8 양자화 모델을 ONNX Runtime으로 실행 (encode 호환)
+        from app.core.onnx_embedder import OnnxSentenceEmbedder
+        print(f"Loading ONNX embedding model: {onnx_model_dir}")
+        device = 'cpu'
+        model = OnnxSentenceEmbedder(onnx_model_dir)
+    else:
+        print(f"Loading sentence transformer model: {model_name}")
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        model = SentenceTransformer(model_name, device=device)
+        if device == 'cuda':
+            # GPU에서는 FP16으로 추론 (cosine 검색에는 정밀도 차이가 무시할 수준)
+            model.half()
+        else:
+            torch.set_num_threads(os.cpu_count() or 1)
     
-    # 텍스트 추출
-    texts = [chunk['content'] for chunk in chunks]
-    print(f"Encoding {len(texts)} chunks...")
+    # 텍스트 추출 (본문이 같은 청크는 blake2b 해시로 묶어 한 번만 인코딩)
+    seen = {}
+    texts = []
+    chunk_to_row = []
+    for chunk in chunks:
+        digest = hashlib.blake2b(chunk['content'].encode('utf-8'), digest_size=16).digest()
+        row = seen.get(digest)
+        if row is None:
+            row = seen[digest] = len(texts)
+            texts.append(chunk['content'])
+        chunk_to_row.append(row)
+    print(f"Encoding {len(texts)} unique chunks (of {len(chunks)})...")
     
-    # 임베딩 생성
-    embeddings = model.encode(texts, show_progress_bar=True)
-    embeddings = np.array(embeddings).astype('float32')
+    # 임베딩 생성 (cosine similarity를 위해 모델에서 바로 L2 정규화된 배열을 받으므로 normalize_L2 불필요)
+    # encode는 내부적으로 길이순 정렬 후 배치를 구성하고 원래 순서로 되돌려 패딩 낭비를 줄임
+    # FAISS는 float32만 지원하므로 여기서 한 번만 변환 (CPU FP32 추론이면 복사 없음)
+    if num_workers > 1 and device == 'cpu' and not onnx_model_dir and len(texts) > num_workers:
+        # 대규모 코퍼스는 CPU 워커 프로세스로 나눠 인코딩 (num_workers: ENCODE_WORKERS)
+        embeddings = _encode_parallel(model, texts, batch_size, num_workers).astype(np.float32, copy=False)
+    else:
+        with torch.inference_mode():
+            embeddings = model.encode(
+                texts,
+                batch_size=batch_size,
+                show_progress_bar=True,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                device=device
+            ).astype(np.float32, copy=False)
+    
+    # 청크별 행으로 다시 펼쳐 인덱스 행 번호와 청크 순서(메타데이터/오프셋)를 일치시킴
+    if len(texts) < len(chunks):
+        embeddings = np.take(embeddings, chunk_to_row, axis=0)
     
     # FAISS 인덱스 생성
     dimension = embeddings.shape[1]
-    index = faiss.IndexFlatIP(dimension)  # 내적 유사도 사용
+    if index_type == "flat":
+        index = faiss.IndexFlatIP(dimension)  # 내적 유사도 사용 (전수 탐색)
+    elif index_type == "hnsw":
+        # HNSW 그래프 인덱스 (내적 유사도, O(log N) 근사 탐색)
+        index = faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = 64
+    elif index_type == "ivf":
+        # IVF 인덱스 (대규모 코퍼스용, 내적 유사도 quantizer로 클러스터링 후 일부 클러스터만 탐색)
+        nlist = max(1, int(np.sqrt(len(embeddings))))
+        quantizer = faiss.IndexFlatIP(dimension)
+        index = faiss.IndexIVFFlat(quantizer, dimension, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings)
+    else:
+        raise ValueError(f"지원하지 않는 인덱스 타입: {index_type}")
+    
+    # GPU가 있으면 Flat/IVF 인덱스는 GPU에서 추가/검색 (HNSW는 GPU 미지원)
+    if index_type in ("flat", "ivf") and faiss.get_num_gpus() > 0:
+        index = _index_to_gpu(index)
     
-    # 벡터 정규화 (cosine similarity를 위해)
-    faiss.normalize_L2(embeddings)
     index.add(embeddings)
     
-    print(f"Created FAISS index with {index.ntotal} vectors, dimension: {dimension}")
+    print(f"Created FAISS {index_type} index with {index.ntotal} vectors, dimension: {dimension}")
     return index, model
 
 def save_index_and_metadata(index, chunks, output_dir="data/vectors"):
     """인덱스와 메타데이터 저장"""
     os.makedirs(output_dir, exist_ok=True)
     
-    # FAISS 인덱스 저장
+    # FAISS 인덱스 저장 (GPU 인덱스는 CPU로 옮겨서 저장)
+    if hasattr(faiss, 'GpuIndex') and isinstance(index, faiss.GpuIndex):
+        index = faiss.index_gpu_to_cpu(index)
     index_path = os.path.join(output_dir, "policy_chunks.faiss")
     faiss.write_index(index, index_path)
     print(f"FAISS index saved to {index_path}")
     
-    # 메타데이터 저장 (청크 정보)
-    metadata = []
-    for i, chunk in enumerate(chunks):
-        metadata.append({
-            'index': i,
-            'chunk_id': chunk['chunk_id'],
-            'content': chunk['content'],
-            'metadata': chunk['metadata']
-        })
+    # 청크 필드를 열 단위 리스트로 한 번씩만 추출 (SoA)
+    chunk_ids = [chunk['chunk_id'] for chunk in chunks]
+    contents = [chunk['content'] for chunk in chunks]
+    chunk_metas = [chunk['metadata'] for chunk in chunks]
+    sources = [meta['source_file'] for meta in chunk_metas]
+    
+    # 청크 본문은 UTF-8 바이트를 하나의 파일로 이어 붙이고 오프셋 배열로 접근
+    # 조회 시 contents.bin 을 mmap 하여 검색된 청크 구간만 디코딩
+    encoded_contents = [content.encode('utf-8') for content in contents]
+    offsets = np.zeros(len(encoded_contents) + 1, dtype=np.int64)
+    np.cumsum([len(content) for content in encoded_contents], out=offsets[1:])
+    with open(os.path.join(output_dir, "contents.bin"), 'wb') as f:
+        f.write(b"".join(encoded_contents))
+    np.save(os.path.join(output_dir, "offsets.npy"), offsets)
+    # 고정 폭 유니코드 배열로 저장하여 pickle 없이 로드
+    np.save(os.path.join(output_dir, "chunk_ids.npy"), np.array(chunk_ids))
+    np.save(os.path.join(output_dir, "sources.npy"), np.array(sources))
+    print(f"Chunk contents saved to {os.path.join(output_dir, 'contents.bin')}")
+    
+    # pyarrow가 있으면 같은 열들을 압축된 컬럼 포맷(parquet)으로도 저장 (분석/열 단위 조회용)
+    if pa is not None:
+        parquet_path = os.path.join(output_dir, "chunks.parquet")
+        pq.write_table(pa.table({
+            'chunk_id': chunk_ids,
+            'content': contents,
+            'source_file': sources,
+            'document_type': [meta.get('document_type') for meta in chunk_metas],
+        }), parquet_path)
+        print(f"Chunk table saved to {parquet_path}")
+    
+    # 메타데이터 저장 (본문을 제외한 청크 정보)
+    metadata = [
+        {'index': i, 'chunk_id': chunk_id, 'metadata': meta}
+        for i, (chunk_id, meta) in enumerate(zip(chunk_ids, chunk_metas))
+    ]
     
     metadata_path = os.path.join(output_dir, "chunks_metadata.json")
-    with open(metadata_path, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, ensure_ascii=False, indent=2)
+    with open(metadata_path, 'wb') as f:
+        f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     print(f"Metadata saved to {metadata_path}")
     
     return index_path, metadata_path
@@ -78,8 +231,12 @@ def main():
     chunks = load_all_chunks()
     print(f"Loaded {len(chunks)} chunks from cleaned_v4 data")
     
-    # FAISS 인덱스 생성
-    index, model = create_faiss_index(chunks)
+    # FAISS 인덱스 생성 (EMBEDDING_BACKEND=onnx 이면 서비스와 같은 int8 ONNX 인코더 사용)
+    onnx_model_dir = None
+    if os.getenv('EMBEDDING_BACKEND', 'torch').lower() == 'onnx':
+        onnx_model_dir = os.getenv('ONNX_MODEL_DIR', 'data/models/onnx_embedder')
+    index, model = create_faiss_index(chunks, onnx_model_dir=onnx_model_dir,
+                                      num_workers=int(os.getenv('ENCODE_WORKERS', '1')))
     
     # 저장
     index_path, metadata_path = save_index_and_metadata(index, chunks)
@@ -87,9 +244,10 @@ def main():
     # 테스트 검색
     print("\nTesting search functionality...")
     test_query = "알림톡 템플릿 승인 거부 사유"
-    query_embedding = model.encode([test_query])
-    query_embedding = np.array(query_embedding).astype('float32')
-    faiss.normalize_L2(query_embedding)
+    with torch.inference_mode():
+        query_embedding = model.encode(
+            [test_query], convert_to_numpy=True, normalize_embeddings=True
+        ).astype(np.float32, copy=False)
     
     k = 3
     scores, indices = index.search(query_embedding, k)
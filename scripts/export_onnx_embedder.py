@@ -0,0 +1,49 @@
+"""
+SentenceTransformer 임베딩 모델을 ONNX로 내보내고 int8 동적 양자화 적용
+실행: python scripts/export_onnx_embedder.py
+"""
+
+import argparse
+import shutil
+from pathlib import Path
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+
+def _copy_sentence_bert_config(model_name, output_dir: Path):
+    """SentenceTransformer 설정(max_seq_length 등)을 함께 복사해 ONNX 백엔드가 같은 길이에서 자르도록 함"""
+    local_config = Path(model_name) / "sentence_bert_config.json"
+    if local_config.exists():
+        source = local_config
+    else:
+        from huggingface_hub import hf_hub_download
+        source = hf_hub_download(model_name, "sentence_bert_config.json")
+    shutil.copy(source, output_dir / "sentence_bert_config.json")
+
+def export_onnx_embedder(model_name='sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2',
+                         output_dir="data/models/onnx_embedder"):
+    """ONNX 변환 후 avx512_vnni 동적 양자화 모델 저장"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    print(f"Exporting {model_name} to ONNX...")
+    model = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+    model.save_pretrained(output_dir)
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    _copy_sentence_bert_config(model_name, output_dir)
+    
+    # 동적 양자화 (가중치 int8, 활성값은 실행 시 양자화)
+    print("Applying int8 dynamic quantization...")
+    quantizer = ORTQuantizer.from_pretrained(model)
+    qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+    quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+    
+    print(f"Saved quantized model to {output_dir / 'model_quantized.onnx'}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export int8 ONNX embedding model")
+    parser.add_argument("--model-name", default='sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2')
+    parser.add_argument("--output-dir", default="data/models/onnx_embedder")
+    args = parser.parse_args()
+    
+    export_onnx_embedder(args.model_name, args.output_dir)
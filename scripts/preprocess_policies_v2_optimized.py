@@ -9,10 +9,62 @@
 
 import os
 import re
-import json
+import orjson
 from pathlib import Path
 from typing import Dict, List, Tuple
 from datetime import datetime
+from collections import Counter
+from multiprocessing import Pool
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 정제 단계에서 반복 사용하는 정규식은 모듈 로드 시 한 번만 컴파일
+_WS = re.compile(r'[ \t]+')
+_NL = re.compile(r'\n{3,}')
+# 헤더/리스트/코드블록/표가 아닌 줄의 앞 공백 (한 줄 안에서만 매칭하도록 \s 대신 [^\S\n] 사용)
+_NON_STRUCT_LEADING_WS = re.compile(
+    r'^(?!#{1,6}[^\S\n]|[^\S\n]*[-*+][^\S\n]|[^\S\n]*\d+\.[^\S\n]|```|[^\S\n]*\|)[^\S\n]+',
+    re.MULTILINE
+)
+_TRAILING_WS = re.compile(r'[^\S\n]+$', re.MULTILINE)
+_EMPTY_TABLE_ROW = re.compile(r'\|\s*\|\s*\|\s*\n')
+_REPEATED_RULE = re.compile(r'(\*{3,}\n?){2,}')
+_HEADER = re.compile(r'^(#{1,6})\s+(.+)')
+_KOREAN_SENTENCE = re.compile(r'[가-힣][^.!?]*[.!?]')
+
+# 정책 문서 주요 키워드 그룹 (그룹명: 패턴)
+_KEYWORD_GROUPS = {
+    'approval': r'승인|검토|심사|허가',
+    'reject': r'거부|반려|금지|제한',
+    'tpl': r'템플릿|양식|형식',
+    'policy': r'정책|규정|규칙|기준',
+    'ad': r'광고|홍보|마케팅',
+    'privacy': r'개인정보|민감정보',
+}
+
+# 문서 유형 분류 규칙 (파일명 키워드, 내용 키워드, 유형) - 앞쪽 규칙이 우선
+_DOCUMENT_TYPE_RULES = [
+    ('audit', '심사', 'audit_policy'),
+    ('guide', '가이드', 'content_guide'),
+    ('operation', '운영', 'operation_policy'),
+    ('template', '템플릿', 'template_guide'),
+    ('infotalk', None, 'infotalk_policy'),
+]
+
+# 파일명 + 내용을 한 번의 선형 스캔으로 분류하기 위한 Aho-Corasick 오토마톤 (설치된 경우)
+# 값은 (규칙 우선순위, 파일명 키워드 여부)
+if ahocorasick is not None:
+    _DOCUMENT_TYPE_AUTOMATON = ahocorasick.Automaton()
+    for _priority, (_file_keyword, _content_keyword, _) in enumerate(_DOCUMENT_TYPE_RULES):
+        _DOCUMENT_TYPE_AUTOMATON.add_word(_file_keyword, (_priority, True))
+        if _content_keyword:
+            _DOCUMENT_TYPE_AUTOMATON.add_word(_content_keyword, (_priority, False))
+    _DOCUMENT_TYPE_AUTOMATON.make_automaton()
+else:
+    _DOCUMENT_TYPE_AUTOMATON = None
 
 class OptimizedPolicyPreprocessor:
     def __init__(self, input_dir: str, output_dir: str):
@@ -28,31 +80,25 @@ class OptimizedPolicyPreprocessor:
             "processing_date": datetime.now().isoformat()
         }
 
+        # 키워드 그룹을 하나의 정규식으로 묶어 문서를 한 번만 스캔
+        self._kw_re = re.compile(
+            '|'.join(f'(?P<{name}>{pattern})' for name, pattern in _KEYWORD_GROUPS.items()),
+            re.IGNORECASE
+        )
+
     def clean_text_content(self, content: str) -> str:
         """텍스트 내용 정제"""
         
         # 1. 연속된 공백, 탭을 단일 공백으로 변경
-        content = re.sub(r'[ \t]+', ' ', content)
+        content = _WS.sub(' ', content)
         
         # 2. 연속된 개행을 최대 2개로 제한
-        content = re.sub(r'\n{3,}', '\n\n', content)
+        content = _NL.sub('\n\n', content)
         
         # 3. 줄 시작/끝의 공백 제거 (마크다운 구조 보존)
-        lines = content.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            # 마크다운 헤더, 리스트, 코드블록은 구조 보존
-            if re.match(r'^#{1,6}\s', line) or \
-               re.match(r'^[\s]*[-*+]\s', line) or \
-               re.match(r'^[\s]*\d+\.\s', line) or \
-               re.match(r'^```', line) or \
-               re.match(r'^[\s]*\|', line):
-                cleaned_lines.append(line.rstrip())
-            else:
-                cleaned_lines.append(line.strip())
-        
-        content = '\n'.join(cleaned_lines)
+        # 줄 단위 분할 없이 정규식 두 번으로 처리: 헤더, 리스트, 코드블록, 표가 아닌 줄만 앞 공백 제거
+        content = _NON_STRUCT_LEADING_WS.sub('', content)
+        content = _TRAILING_WS.sub('', content)
         
         # 4. 특수 문자 정규화
         # 전각 문자를 반각으로 변경
@@ -62,10 +108,10 @@ class OptimizedPolicyPreprocessor:
         
         # 5. 불필요한 마크다운 요소 정리
         # 빈 테이블 행 제거
-        content = re.sub(r'\|\s*\|\s*\|\s*\n', '', content)
+        content = _EMPTY_TABLE_ROW.sub('', content)
         
         # 6. 연속된 구분선(***) 정리
-        content = re.sub(r'(\*{3,}\n?){2,}', '***\n', content)
+        content = _REPEATED_RULE.sub('***\n', content)
         
         # 7. 시작/끝 공백 제거
         content = content.strip()
@@ -79,7 +125,7 @@ class OptimizedPolicyPreprocessor:
         # 헤더 구조 분석
         headers = []
         for i, line in enumerate(lines):
-            header_match = re.match(r'^(#{1,6})\s+(.+)', line)
+            header_match = _HEADER.match(line)
             if header_match:
                 level = len(header_match.group(1))
                 title = header_match.group(2).strip()
@@ -94,23 +140,11 @@ class OptimizedPolicyPreprocessor:
         line_count = len(lines)
         word_count = len(content.split())
         
-        # 한국어 문장 수 추정
-        korean_sentences = len(re.findall(r'[가-힣][^.!?]*[.!?]', content))
+        # 한국어 문장 수 추정 (매칭 리스트를 만들지 않고 개수만 셈)
+        korean_sentences = sum(1 for _ in _KOREAN_SENTENCE.finditer(content))
         
         # 주요 키워드 추출 (정책 문서용)
-        policy_keywords = []
-        keyword_patterns = [
-            r'(승인|검토|심사|허가)',
-            r'(거부|반려|금지|제한)',
-            r'(템플릿|양식|형식)',
-            r'(정책|규정|규칙|기준)',
-            r'(광고|홍보|마케팅)',
-            r'(개인정보|민감정보)',
-        ]
-        
-        for pattern in keyword_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            policy_keywords.extend(matches)
+        policy_keywords = {m.group() for m in self._kw_re.finditer(content)}
         
         return {
             "filename": filename,
@@ -122,32 +156,34 @@ class OptimizedPolicyPreprocessor:
                 "korean_sentences": korean_sentences,
                 "header_count": len(headers)
             },
-            "policy_keywords": list(set(policy_keywords)),
+            "policy_keywords": list(policy_keywords),
             "document_type": self._classify_document_type(content, filename)
         }
 
     def _classify_document_type(self, content: str, filename: str) -> str:
         """문서 유형 분류"""
         filename_lower = filename.lower()
-        content_lower = content.lower()
-        
-        if 'audit' in filename_lower or '심사' in content_lower:
-            return 'audit_policy'
-        elif 'guide' in filename_lower or '가이드' in content_lower:
-            return 'content_guide'
-        elif 'operation' in filename_lower or '운영' in content_lower:
-            return 'operation_policy'
-        elif 'template' in filename_lower or '템플릿' in content_lower:
-            return 'template_guide'
-        elif 'infotalk' in filename_lower:
-            return 'infotalk_policy'
-        else:
+        # 내용 키워드는 모두 한글이라 소문자 변환 없이 비교해도 결과가 같음
+        
+        if _DOCUMENT_TYPE_AUTOMATON is not None:
+            # 파일명과 내용을 구분자로 이어 한 번만 스캔하고, 매칭 위치로 키워드 출처를 판별
+            best = len(_DOCUMENT_TYPE_RULES)
+            for end, (priority, is_file_keyword) in _DOCUMENT_TYPE_AUTOMATON.iter(filename_lower + '\x00' + content):
+                if is_file_keyword == (end < len(filename_lower)) and priority < best:
+                    best = priority
+                    if best == 0:
+                        break
+            if best < len(_DOCUMENT_TYPE_RULES):
+                return _DOCUMENT_TYPE_RULES[best][2]
             return 'general_policy'
-
-    def process_file(self, file_path: Path) -> Tuple[str, Dict]:
-        """단일 파일 처리"""
-        print(f"처리 중: {file_path.name}")
         
+        for file_keyword, content_keyword, document_type in _DOCUMENT_TYPE_RULES:
+            if file_keyword in filename_lower or (content_keyword and content_keyword in content):
+                return document_type
+        return 'general_policy'
+
+    def process_file(self, file_path: Path) -> Tuple[str, Dict, int]:
+        """단일 파일 처리 (정제 내용, 메타데이터, 원본 문자 수 반환)"""
         # 원본 파일 읽기
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
@@ -157,23 +193,35 @@ class OptimizedPolicyPreprocessor:
             with open(file_path, 'r', encoding='cp949') as f:
                 original_content = f.read()
         
-        # 통계 업데이트
-        self.stats["total_chars_original"] += len(original_content)
-        
         # 텍스트 정제
         cleaned_content = self.clean_text_content(original_content)
         
         # 메타데이터 추출
         metadata = self.extract_metadata(cleaned_content, file_path.name)
         
-        # 통계 업데이트
-        self.stats["total_chars_cleaned"] += len(cleaned_content)
-        
-        reduction_percentage = ((len(original_content) - len(cleaned_content)) / len(original_content)) * 100
-        print(f"  - 원본: {len(original_content):,}자 → 정제: {len(cleaned_content):,}자")
-        print(f"  - 압축률: {reduction_percentage:.1f}%")
+        return cleaned_content, metadata, len(original_content)
+
+    def _process_and_save(self, file_path: Path) -> Dict:
+        """워커 프로세스용: 파일 처리와 저장 후 결과 요약 반환 (예외는 결과로 전달)"""
+        try:
+            cleaned_content, metadata, original_chars = self.process_file(file_path)
+            # 압축률도 파일별 오류 처리 안에서 계산 (빈 파일은 ZeroDivisionError로 해당 파일만 실패)
+            reduction_percentage = ((original_chars - len(cleaned_content)) / original_chars) * 100
+            cleaned_file, metadata_file = self.save_cleaned_file(
+                cleaned_content, metadata, file_path.name
+            )
+        except Exception as e:
+            return {"filename": file_path.name, "error": str(e)}
         
-        return cleaned_content, metadata
+        return {
+            "filename": file_path.name,
+            "metadata": metadata,
+            "original_chars": original_chars,
+            "cleaned_chars": len(cleaned_content),
+            "reduction_percentage": reduction_percentage,
+            "cleaned_file": cleaned_file.name,
+            "metadata_file": metadata_file.name
+        }
 
     def save_cleaned_file(self, content: str, metadata: Dict, original_filename: str):
         """정제된 파일 저장"""
@@ -188,8 +236,8 @@ class OptimizedPolicyPreprocessor:
         
         # 메타데이터 JSON 파일 저장
         metadata_file = self.output_dir / f"{base_name}_metadata.json"
-        with open(metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(metadata, f, ensure_ascii=False, indent=2)
+        with open(metadata_file, 'wb') as f:
+            f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         return cleaned_file, metadata_file
 
@@ -205,24 +253,30 @@ class OptimizedPolicyPreprocessor:
         
         all_metadata = []
         
-        for md_file in md_files:
-            try:
-                # 파일 처리
-                cleaned_content, metadata = self.process_file(md_file)
-                
-                # 파일 저장
-                cleaned_file, metadata_file = self.save_cleaned_file(
-                    cleaned_content, metadata, md_file.name
-                )
-                
-                all_metadata.append(metadata)
-                self.stats["processed_files"] += 1
-                
-                print(f"  [완료] 저장: {cleaned_file.name}, {metadata_file.name}\n")
-                
-            except Exception as e:
-                print(f"  [오류] 발생 - {md_file.name}: {str(e)}\n")
+        # 파일별 정제/저장은 서로 독립적인 CPU 작업이므로 프로세스 풀에서 병렬 처리
+        with Pool(processes=min(os.cpu_count() or 1, len(md_files))) as pool:
+            results = pool.map(self._process_and_save, md_files)
+        
+        # 통계 집계와 출력은 메인 프로세스에서 파일 순서대로 수행
+        for result in results:
+            print(f"처리 중: {result['filename']}")
+            
+            if "error" in result:
+                print(f"  [오류] 발생 - {result['filename']}: {result['error']}\n")
                 continue
+            
+            original_chars = result["original_chars"]
+            cleaned_chars = result["cleaned_chars"]
+            self.stats["total_chars_original"] += original_chars
+            self.stats["total_chars_cleaned"] += cleaned_chars
+            
+            print(f"  - 원본: {original_chars:,}자 → 정제: {cleaned_chars:,}자")
+            print(f"  - 압축률: {result['reduction_percentage']:.1f}%")
+            
+            all_metadata.append(result["metadata"])
+            self.stats["processed_files"] += 1
+            
+            print(f"  [완료] 저장: {result['cleaned_file']}, {result['metadata_file']}\n")
         
         # 전체 통계 저장
         self._save_processing_stats(all_metadata)
@@ -247,22 +301,19 @@ class OptimizedPolicyPreprocessor:
         summary = {
             "processing_stats": self.stats,
             "files_metadata": all_metadata,
-            "document_types": {},
-            "total_keywords": {}
+            # 문서 유형별 통계
+            "document_types": Counter(
+                metadata.get("document_type", "unknown") for metadata in all_metadata
+            ),
+            # 전체 키워드 통계
+            "total_keywords": Counter(
+                keyword for metadata in all_metadata
+                for keyword in metadata.get("policy_keywords", [])
+            )
         }
         
-        # 문서 유형별 통계
-        for metadata in all_metadata:
-            doc_type = metadata.get("document_type", "unknown")
-            summary["document_types"][doc_type] = summary["document_types"].get(doc_type, 0) + 1
-        
-        # 전체 키워드 통계
-        for metadata in all_metadata:
-            for keyword in metadata.get("policy_keywords", []):
-                summary["total_keywords"][keyword] = summary["total_keywords"].get(keyword, 0) + 1
-        
-        with open(stats_file, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+        with open(stats_file, 'wb') as f:
+            f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         print(f"처리 통계 저장: {stats_file}")
 
@@ -5,74 +5,97 @@ data/policies_v2의 모든 .md 파일을 RAG 시스템용으로 전처리
 """
 
 import os
-import json
+import orjson
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 from pathlib import Path
+from multiprocessing import Pool
 import hashlib
 
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # numba 미설치 시 파이썬 루프로 청킹
+    njit = None
+
+# 정제/키워드 추출에서 반복 사용하는 정규식은 모듈 로드 시 한 번만 컴파일
+_IMG = re.compile(r'!\[.*?\]\(.*?\)')
+_IMG_TAG = re.compile(r'<img.*?>', re.IGNORECASE)
+_TABLE_RULE = re.compile(r'\|[\s\-\|:]+\|')
+_HTML_TAG = re.compile(r'<[^>]+>')
+_NL = re.compile(r'\n{3,}')
+_SPACES = re.compile(r' {2,}')
+_HEADER_MARK = re.compile(r'^#{1,6}\s', re.MULTILINE)
+_SPECIAL_CHARS = re.compile(r'[^\w\s가-힣ㄱ-ㅎㅏ-ㅣ.,!?():\-\[\]{}]')
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+# 파일명 기반 키워드 (파일명에 key가 포함되면 words 추가)
+_FILE_KEYWORDS = {
+    'infotalk': ['알림톡', 'InfoTalk'],
+    'content-guide': ['콘텐츠가이드', '템플릿작성', '가이드'],
+    'audit': ['심사', '검수', '승인'],
+    'operations': ['운영정책', '정책'],
+    'publictemplate': ['공용템플릿', '템플릿'],
+    'black-list': ['금지어', '블랙리스트', '제한사항'],
+    'white-list': ['허용', '화이트리스트', '승인']
+}
+
+# 본문 키워드 패턴을 하나의 정규식으로 묶어 텍스트를 한 번만 스캔
+_KEYWORD_RE = re.compile(
+    r'(?P<infotalk>알림톡|InfoTalk)'
+    r'|(?P<template>템플릿|template)'
+    r'|(?P<audit>심사|검수|승인|approval)'
+    r'|(?P<policy>정책|policy|가이드|guide)'
+    r'|(?P<content>콘텐츠|content)'
+    r'|(?P<send>발송|전송|send)'
+    r'|(?P<channel>채널|channel)'
+    r'|(?P<business>사업자|business)'
+    r'|(?P<api>API)'
+    r'|(?P<message>메시지|message)',
+    re.IGNORECASE
+)
+
 def clean_text(text: str) -> str:
     """불필요한 텍스트 제거 및 정제"""
     # 이미지 참조 제거
-    text = re.sub(r'!\[.*?\]\(.*?\)', '', text)
-    text = re.sub(r'<img.*?>', '', text, flags=re.IGNORECASE)
+    text = _IMG.sub('', text)
+    text = _IMG_TAG.sub('', text)
     
     # 표 마크다운 정리 (표 구분선 제거)
-    text = re.sub(r'\|[\s\-\|:]+\|', '', text)
+    text = _TABLE_RULE.sub('', text)
     
     # HTML 태그 제거
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _HTML_TAG.sub('', text)
     
     # 연속된 공백 및 줄바꿈 정리
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
+    text = _NL.sub('\n\n', text)
+    text = _SPACES.sub(' ', text)
     
     # 마크다운 헤더 표시 간소화
-    text = re.sub(r'^#{1,6}\s', '', text, flags=re.MULTILINE)
+    text = _HEADER_MARK.sub('', text)
     
     # 불필요한 특수문자 제거
-    text = re.sub(r'[^\w\s가-힣ㄱ-ㅎㅏ-ㅣ.,!?():\-\[\]{}]', '', text)
+    text = _SPECIAL_CHARS.sub('', text)
     
     return text.strip()
 
 def extract_keywords(text: str, filename: str) -> List[str]:
     """텍스트에서 키워드 추출"""
-    keywords = []
+    # 등장 순서를 유지하는 dict로 중복 제거 (파일명 키워드가 먼저)
+    keywords = {}
     
     # 파일명 기반 키워드
-    file_keywords = {
-        'infotalk': ['알림톡', 'InfoTalk'],
-        'content-guide': ['콘텐츠가이드', '템플릿작성', '가이드'],
-        'audit': ['심사', '검수', '승인'],
-        'operations': ['운영정책', '정책'],
-        'publictemplate': ['공용템플릿', '템플릿'],
-        'black-list': ['금지어', '블랙리스트', '제한사항'],
-        'white-list': ['허용', '화이트리스트', '승인']
-    }
-    
-    for key, words in file_keywords.items():
+    for key, words in _FILE_KEYWORDS.items():
         if key in filename:
-            keywords.extend(words)
-    
-    # 텍스트 내 주요 키워드 추출
-    keyword_patterns = [
-        r'알림톡|InfoTalk',
-        r'템플릿|template',
-        r'심사|검수|승인|approval',
-        r'정책|policy|가이드|guide',
-        r'콘텐츠|content',
-        r'발송|전송|send',
-        r'채널|channel',
-        r'사업자|business',
-        r'API',
-        r'메시지|message'
-    ]
-    
-    for pattern in keyword_patterns:
-        matches = re.findall(pattern, text, re.IGNORECASE)
-        keywords.extend([match for match in matches if match not in keywords])
-    
-    return list(set(keywords))[:5]  # 최대 5개 키워드
+            keywords.update(dict.fromkeys(words))
+    
+    # 텍스트 내 주요 키워드 추출 (최대 개수가 모이면 더 스캔하지 않음)
+    for match in _KEYWORD_RE.finditer(text):
+        if len(keywords) >= 5:
+            break
+        keywords.setdefault(match.group())
+    
+    return list(keywords)[:5]  # 최대 5개 키워드
 
 def get_document_type(filename: str) -> str:
     """파일명 기반 문서 타입 결정"""
@@ -106,36 +129,77 @@ def extract_section_from_text(text: str) -> str:
     
     return first_line
 
-def semantic_chunk_text(text: str, min_chars: int = 200, max_chars: int = 400) -> List[str]:
-    """의미 단위 기반 텍스트 청킹"""
-    sentences = re.split(r'(?<=[.!?])\s+', text)
-    chunks = []
-    current_chunk = ""
+def _chunk_indices(lens, min_chars, max_chars):
+    """문장 길이 배열로 청크 경계 계산 (청크 j는 sentences[bounds[j]:bounds[j+1]])"""
+    bounds = [0]
+    cur_len = 0
+    for i in range(len(lens)):
+        new_len = cur_len + 1 + lens[i] if cur_len else lens[i]
+        if new_len <= max_chars:
+            cur_len = new_len
+        elif cur_len >= min_chars:
+            bounds.append(i)
+            cur_len = lens[i]
+        else:
+            cur_len = new_len
+    bounds.append(len(lens))
+    return bounds
+
+if njit is not None:
+    _chunk_indices = njit(cache=True)(_chunk_indices)
+
+def _iter_sentences(text: str) -> Iterator[str]:
+    """문장 경계(. ! ? 뒤 공백)로 나눈 조각을 리스트 없이 순서대로 생성 (re.split과 동일)"""
+    start = 0
+    for match in _SENTENCE_SPLIT.finditer(text):
+        yield text[start:match.start()]
+        start = match.end()
+    yield text[start:]
+
+def _iter_sentence_chunks(sentences: Iterable[str], min_chars: int, max_chars: int) -> Iterator[str]:
+    """문장을 순서대로 받아 청크가 완성될 때마다 생성"""
+    # 문자열을 이어 붙이지 않고 문장 리스트와 길이만 유지하다가 청크 경계에서 한 번 join
+    buf = []
+    buf_len = 0
     
     for sentence in sentences:
         sentence = sentence.strip()
         if not sentence:
             continue
             
-        # 현재 청크에 문장을 추가했을 때의 길이 체크
-        potential_chunk = current_chunk + " " + sentence if current_chunk else sentence
+        # 현재 청크에 문장을 추가했을 때의 길이 체크 (공백 1자 포함)
+        new_len = buf_len + 1 + len(sentence) if buf else len(sentence)
         
-        if len(potential_chunk) <= max_chars:
-            current_chunk = potential_chunk
+        if new_len <= max_chars:
+            buf.append(sentence)
+            buf_len = new_len
         else:
             # 현재 청크가 최소 길이를 만족하면 추가
-            if len(current_chunk) >= min_chars:
-                chunks.append(current_chunk.strip())
-                current_chunk = sentence
+            if buf_len >= min_chars:
+                yield ' '.join(buf)
+                buf = [sentence]
+                buf_len = len(sentence)
             else:
                 # 최소 길이를 만족하지 않으면 계속 추가 (최대 길이 초과하더라도)
-                current_chunk = potential_chunk
+                buf.append(sentence)
+                buf_len = new_len
     
     # 마지막 청크 처리
-    if current_chunk.strip():
-        chunks.append(current_chunk.strip())
+    if buf:
+        yield ' '.join(buf)
+
+def semantic_chunk_text(text: str, min_chars: int = 200, max_chars: int = 400) -> List[str]:
+    """의미 단위 기반 텍스트 청킹"""
+    if njit is not None:
+        # 길이 정수만으로 경계를 JIT 계산한 뒤 청크마다 한 번만 join
+        sentences = [s for s in (sentence.strip() for sentence in _iter_sentences(text)) if s]
+        if not sentences:
+            return []
+        lens = np.array([len(s) for s in sentences], dtype=np.int64)
+        bounds = _chunk_indices(lens, min_chars, max_chars)
+        return [' '.join(sentences[bounds[j]:bounds[j + 1]]) for j in range(len(bounds) - 1)]
     
-    return chunks
+    return list(_iter_sentence_chunks(_iter_sentences(text), min_chars, max_chars))
 
 def process_markdown_file(file_path: Path) -> List[Dict[str, Any]]:
     """마크다운 파일 처리하여 청크들 생성"""
@@ -193,8 +257,12 @@ def main():
     md_files = list(input_dir.glob("*.md"))
     print(f"Found {len(md_files)} markdown files to process")
     
-    for md_file in md_files:
-        chunks = process_markdown_file(md_file)
+    # 파일별 처리는 서로 독립적인 CPU 작업이므로 프로세스 풀에서 병렬 처리
+    with Pool(processes=min(os.cpu_count() or 1, len(md_files) or 1)) as pool:
+        all_file_chunks = pool.map(process_markdown_file, md_files)
+    
+    # 집계는 메인 프로세스에서 파일 순서대로 수행
+    for md_file, chunks in zip(md_files, all_file_chunks):
         all_chunks.extend(chunks)
         
         file_stats[md_file.name] = {
@@ -205,8 +273,8 @@ def main():
     
     # 전체 결과를 JSON 파일로 저장
     output_file = output_dir / "processed_chunks.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_chunks, f, ensure_ascii=False, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(all_chunks, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     
     # 통계 정보 저장
     stats = {
@@ -219,8 +287,8 @@ def main():
     }
     
     stats_file = output_dir / "processing_statistics.json"
-    with open(stats_file, 'w', encoding='utf-8') as f:
-        json.dump(stats, f, ensure_ascii=False, indent=2)
+    with open(stats_file, 'wb') as f:
+        f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
     
     print(f"\n=== 전처리 완료 ===")
     print(f"총 파일 수: {stats['total_files']}")
@@ -1,22 +1,41 @@
 """
 고도화된 RAG용 데이터 전처리 스크립트
 - 의미 기반 청킹 (섹션 경계 우선, 800자 목표, 100자 오버랩)
-- 계층적 메타데이터 생성
+- 계층적 메타데이터 생성 (문서 계층 구조는 hierarchies/에 문서당 한 번 저장하고 청크는 참조)
 - 다중 표현 생성 (original, summarized, keywords, question_variants)
 - 컨텍스트 보존 (prev_content, next_content 포함)
 - 한국어 검색 최적화용 키워드 추출
 """
 
 import os
-import json
+import bisect
+import itertools
+import orjson
 import re
 import uuid
 from pathlib import Path
 from typing import List, Dict, Any, Tuple, Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 
-@dataclass
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    from fastcdc import fastcdc
+except ImportError:
+    fastcdc = None
+
+# 파생 결과 생성 규칙(키워드 사전, 요약/질문 생성 방식)이 바뀌면 올려서 이전 캐시를 무효화
+DERIVATION_CACHE_VERSION = 1
+
+# slots: 청크마다 인스턴스 __dict__를 만들지 않고, orjson이 필드를 바로 읽어 직렬화
+@dataclass(slots=True)
 class EnhancedChunk:
     id: str
     document_name: str
@@ -28,7 +47,8 @@ class EnhancedChunk:
     created_at: str
 
 class AdvancedRAGPreprocessor:
-    def __init__(self, input_dir: str, output_dir: str):
+    def __init__(self, input_dir: str, output_dir: str, chunking: str = "semantic",
+                 embedding_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
@@ -37,6 +57,27 @@ class AdvancedRAGPreprocessor:
         self.target_chunk_size = 800
         self.overlap_size = 100
         
+        # 청크 내용 해시 -> 파생 결과(요약/키워드/질문 변형/태그) 캐시, 실행 간에 출력 폴더에 보존
+        self._derivation_cache_file = self.output_dir / "derivation_cache.json"
+        self._derivation_cache = self._load_derivation_cache()
+        
+        # 청킹 방식: semantic(라인 규칙 기반), cdc(fastcdc 내용 기반), embedding(문장 임베딩 거리 기반)
+        if chunking == "cdc" and fastcdc is None:
+            print("fastcdc가 설치되어 있지 않아 의미 기반 청킹을 사용합니다.")
+            chunking = "semantic"
+        self._sentence_model = None
+        if chunking == "embedding":
+            try:
+                import torch
+                from sentence_transformers import SentenceTransformer
+                device = 'cuda' if torch.cuda.is_available() else 'cpu'
+                self._sentence_model = SentenceTransformer(embedding_model, device=device)
+            except ImportError:
+                print("sentence-transformers를 불러올 수 없어 의미 기반 청킹을 사용합니다.")
+                chunking = "semantic"
+        self.chunking = chunking
+        self.embedding_breakpoint_percentile = 95
+        
         # 한국어 의미 단위 패턴
         self.section_patterns = [
             r'^#{1,6}\s+.*$',  # 마크다운 헤더
@@ -46,6 +87,19 @@ class AdvancedRAGPreprocessor:
             r'.*:\s*$',        # 콜론으로 끝나는 라인
         ]
         
+        # 라인마다 반복 사용하는 정규식은 한 번만 컴파일 (섹션 경계 패턴은 하나의 alternation으로 결합)
+        self._boundary_re = re.compile('|'.join(f'(?:{p})' for p in self.section_patterns))
+        # 헤더/번호 리스트 라인을 문서 전체에서 한 번에 찾는 패턴 (한 줄 안에서만 매칭하도록 [^\S\n] 사용)
+        # (표식 뒤 공백에 NBSP/U+3000 등이 올 수 있어 바이트가 아닌 문자열에서 매칭)
+        self._hier_re = re.compile(
+            r'^(?P<h>#{1,6})[^\S\n]+(?P<title>.*)$|^(?P<li>\d+\.[^\S\n]+.*)$',
+            re.MULTILINE
+        )
+        self._korean_re = re.compile(r'[가-힣]{2,8}')
+        self._sentence_end_re = re.compile(r'[.!?]\s*')
+        # 임베딩 청킹용 문장 단위 (줄을 넘지 않고 문장부호까지, 부호가 없으면 줄 끝까지)
+        self._sentence_span_re = re.compile(r'[^\n.!?]*[.!?]+|[^\n]+')
+        
         # 의미 태그 키워드 매핑
         self.semantic_keywords = {
             "정책": ["정책", "규정", "규칙", "기준", "원칙", "방침"],
@@ -59,38 +113,90 @@ class AdvancedRAGPreprocessor:
             "금융": ["금융", "대출", "투자", "보험", "카드", "결제"],
             "의료": ["의료", "건강", "병원", "치료", "약품", "질병"]
         }
+        
+        # 내용 기반 질문 패턴 (트리거 단어 중 하나라도 있으면 질문 추가)
+        self.question_patterns = [
+            (["금지", "제한"], ["무엇이 금지되나요?", "어떤 제한사항이 있나요?"]),
+            (["승인", "허가"], ["승인 조건은 무엇인가요?", "어떻게 승인받을 수 있나요?"]),
+            (["템플릿"], ["템플릿 작성 방법은?", "템플릿 규칙은 무엇인가요?"]),
+        ]
+        
+        # 키워드 매칭은 대소문자를 구분하지 않으므로 키워드를 미리 소문자로 맞추고,
+        # 대소문자가 있는 키워드가 하나도 없으면(현재처럼 모두 한글) 청크마다 content.lower() 복사를 생략
+        self.semantic_keywords = {
+            tag: [keyword.lower() for keyword in keywords]
+            for tag, keywords in self.semantic_keywords.items()
+        }
+        self.question_patterns = [
+            ([term.lower() for term in terms], questions)
+            for terms, questions in self.question_patterns
+        ]
+        # 태그 키워드와 질문 트리거 단어를 합친 매칭 대상 (청크당 한 번만 찾아 태그/질문 변형에 공유)
+        self._match_terms = list(dict.fromkeys(itertools.chain(
+            itertools.chain.from_iterable(self.semantic_keywords.values()),
+            itertools.chain.from_iterable(terms for terms, _ in self.question_patterns)
+        )))
+        self._tag_needs_casefold = any(term != term.upper() for term in self._match_terms)
+        
+        # 매칭 대상 단어를 한 번의 선형 스캔으로 찾기 위한 Aho-Corasick 오토마톤 (설치된 경우)
+        if ahocorasick is not None:
+            self._tag_automaton = ahocorasick.Automaton()
+            for term in self._match_terms:
+                self._tag_automaton.add_word(term, term)
+            self._tag_automaton.make_automaton()
+        else:
+            self._tag_automaton = None
 
     def read_markdown_file(self, file_path: Path) -> str:
         """마크다운 파일 읽기"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return self.read_markdown_bytes(file_path).decode('utf-8')
 
-    def extract_hierarchy(self, content: str) -> Dict[str, Any]:
-        """문서 계층 구조 추출"""
-        lines = content.split('\n')
+    def read_markdown_bytes(self, file_path: Path) -> bytes:
+        """마크다운 파일을 UTF-8 바이트로 읽기 (텍스트 모드와 같이 개행은 LF로 통일)"""
+        data = file_path.read_bytes()
+        if b'\r' in data:
+            data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+        return data
+
+    def line_starts(self, text) -> List[int]:
+        """각 줄의 시작 오프셋 배열 (str이면 문자, bytes면 바이트 단위) - 오프셋→줄 번호는 bisect로 변환"""
+        newline = b'\n' if isinstance(text, bytes) else '\n'
+        starts = [0]
+        pos = text.find(newline)
+        while pos != -1:
+            starts.append(pos + 1)
+            pos = text.find(newline, pos + 1)
+        return starts
+
+    def extract_hierarchy(self, content: str, line_starts: Optional[List[int]] = None) -> Dict[str, Any]:
+        """문서 계층 구조 추출 (line_starts는 content의 줄 시작 문자 오프셋)"""
+        if line_starts is None:
+            line_starts = self.line_starts(content)
         hierarchy = []
         current_section = None
         
-        for i, line in enumerate(lines):
+        # 라인 분할 없이 헤더/번호 리스트 라인만 순회하고, 줄 번호는 줄 시작 오프셋 배열에서 이진 탐색
+        for match in self._hier_re.finditer(content):
+            line_number = bisect.bisect_right(line_starts, match.start())
+            
             # 헤더 패턴 매칭
-            header_match = re.match(r'^(#{1,6})\s+(.*)', line)
-            if header_match:
-                level = len(header_match.group(1))
-                title = header_match.group(2).strip()
+            if match.group('h'):
+                level = len(match.group('h'))
+                title = match.group('title').strip()
                 hierarchy.append({
                     "level": level,
                     "title": title,
-                    "line_number": i + 1,
+                    "line_number": line_number,
                     "type": "header"
                 })
                 current_section = title
             
             # 번호 리스트 패턴 매칭
-            elif re.match(r'^\d+\.\s+', line):
+            else:
                 hierarchy.append({
                     "level": 99,  # 리스트 아이템은 낮은 우선순위
-                    "title": line.strip(),
-                    "line_number": i + 1,
+                    "title": match.group('li').strip(),
+                    "line_number": line_number,
                     "type": "list_item",
                     "parent_section": current_section
                 })
@@ -104,129 +210,247 @@ class AdvancedRAGPreprocessor:
     def semantic_chunking(self, content: str, hierarchy: Dict) -> List[Dict]:
         """의미 기반 청킹"""
         lines = content.split('\n')
+        # 줄 길이 누적합 (cum[k] = lines[:k] 길이 합): 청크는 [chunk_start, i) 인덱스 구간으로만 관리
+        cum = list(itertools.accumulate((len(line) for line in lines), initial=0))
         chunks = []
-        current_chunk = []
-        current_size = 0
+        chunk_start = 0
         
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            line_size = len(line)
-            
-            # 섹션 경계 확인
-            is_section_boundary = any(re.match(pattern, line) for pattern in self.section_patterns)
+        for i, line in enumerate(lines):
+            current_size = cum[i] - cum[chunk_start]
+            has_chunk = chunk_start < i
             
             # 청크 크기가 목표를 초과하거나 섹션 경계인 경우
-            if (current_size + line_size > self.target_chunk_size and current_chunk) or \
-               (is_section_boundary and current_chunk and current_size > 200):
+            if (current_size + len(line) > self.target_chunk_size and has_chunk) or \
+               (has_chunk and current_size > 200 and self._boundary_re.match(line) is not None):
                 
                 # 현재 청크 저장
                 chunks.append({
-                    "content": '\n'.join(current_chunk),
+                    "content": '\n'.join(lines[chunk_start:i]),
                     "size": current_size,
-                    "start_line": i - len(current_chunk) + 1,
-                    "end_line": i
+                    "start_line": chunk_start + 1,
+                    "end_line": i,
+                    "start_offset": cum[chunk_start] + chunk_start
                 })
                 
-                # 오버랩을 위해 마지막 몇 줄 보존
-                overlap_lines = []
-                overlap_size = 0
-                for j in range(len(current_chunk) - 1, -1, -1):
-                    if overlap_size + len(current_chunk[j]) <= self.overlap_size:
-                        overlap_lines.insert(0, current_chunk[j])
-                        overlap_size += len(current_chunk[j])
-                    else:
-                        break
-                
-                current_chunk = overlap_lines
-                current_size = overlap_size
-            
-            current_chunk.append(line)
-            current_size += line_size
-            i += 1
+                # 오버랩: 끝에서부터 길이 합이 overlap_size 이하인 가장 긴 줄 구간의 시작을 이진 탐색
+                chunk_start = bisect.bisect_left(cum, cum[i] - self.overlap_size, chunk_start, i)
         
         # 마지막 청크 처리
-        if current_chunk:
+        if chunk_start < len(lines):
+            chunks.append({
+                "content": '\n'.join(lines[chunk_start:]),
+                "size": cum[-1] - cum[chunk_start],
+                "start_line": chunk_start + 1,
+                "end_line": len(lines),
+                "start_offset": cum[chunk_start] + chunk_start
+            })
+        
+        return chunks
+
+    def cdc_chunking(self, content: str) -> List[Dict]:
+        """내용 기반(FastCDC) 청킹 - 경계는 바이트 단위 롤링 해시로 정하고 구간 안의 직전 개행으로 맞춤"""
+        data = content.encode('utf-8')
+        chunks = []
+        if not data:
+            return chunks
+        
+        start = 0
+        start_line = 1
+        start_offset = 0
+        cuts = fastcdc(data,
+                       min_size=self.target_chunk_size // 2,
+                       avg_size=self.target_chunk_size,
+                       max_size=self.target_chunk_size * 3 // 2)
+        for cut in cuts:
+            end = cut.offset + cut.length
+            at_newline = False
+            if end < len(data):
+                # 줄 중간에서 자르지 않도록 구간 안의 마지막 개행에서 자름 (구간 첫 바이트의 개행은 빈 청크가 되므로 제외)
+                newline = data.rfind(b'\n', start + 1, end)
+                if newline > start:
+                    end = newline
+                    at_newline = True
+                else:
+                    # 개행이 없으면 CDC 경계를 그대로 쓰되 UTF-8 문자 중간은 피함
+                    while data[end] & 0xC0 == 0x80:
+                        end -= 1
+            
+            piece = data[start:end].decode('utf-8')
+            newlines = piece.count('\n')
             chunks.append({
-                "content": '\n'.join(current_chunk),
-                "size": current_size,
-                "start_line": i - len(current_chunk) + 1,
-                "end_line": i
+                "content": piece,
+                "size": len(piece) - newlines,
+                "start_line": start_line,
+                "end_line": start_line + newlines,
+                "start_offset": start_offset
             })
+            if at_newline:
+                # 경계의 개행은 어느 청크에도 넣지 않고 다음 줄부터 시작
+                start = end + 1
+                start_line += newlines + 1
+                start_offset += len(piece) + 1
+            else:
+                start = end
+                start_line += newlines
+                start_offset += len(piece)
         
         return chunks
 
-    def extract_semantic_tags(self, content: str) -> List[str]:
-        """의미 태그 추출"""
-        tags = []
-        content_lower = content.lower()
+    def embedding_chunking(self, content: str) -> List[Dict]:
+        """임베딩 거리 기반 청킹 - 인접 문장 간 코사인 거리가 상위 백분위를 넘는 곳에서 분할"""
+        import numpy as np
+        
+        line_starts = self.line_starts(content)
+        
+        spans = []
+        for match in self._sentence_span_re.finditer(content):
+            text = match.group().strip()
+            if text:
+                start = match.start() + match.group().find(text[0])
+                spans.append((start, start + len(text), text))
+        if not spans:
+            return []
+        
+        # 문서의 모든 문장을 한 번의 배치 인코딩으로 임베딩 (정규화 벡터라 내적이 코사인 유사도)
+        embeddings = self._sentence_model.encode(
+            [text for _, _, text in spans],
+            batch_size=64,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        distances = 1.0 - (embeddings[:-1] * embeddings[1:]).sum(axis=1)
+        if len(distances):
+            threshold = np.percentile(distances, self.embedding_breakpoint_percentile)
+            breakpoints = distances > threshold
+        else:
+            breakpoints = []
         
-        for tag, keywords in self.semantic_keywords.items():
-            if any(keyword in content_lower for keyword in keywords):
-                tags.append(tag)
+        chunks = []
+        group_start = spans[0][0]
+        group_end = spans[0][1]
+        for i in range(1, len(spans)):
+            start, end, _ = spans[i]
+            # 의미 경계이거나 목표 크기(soft cap)를 넘기게 되면 현재 그룹을 청크로 확정
+            if breakpoints[i - 1] or end - group_start > self.target_chunk_size:
+                chunks.append(self._span_chunk(content, line_starts, group_start, group_end))
+                group_start = start
+            group_end = end
+        chunks.append(self._span_chunk(content, line_starts, group_start, group_end))
         
-        return tags
+        return chunks
+
+    def _span_chunk(self, content: str, line_starts: List[int], start: int, end: int) -> Dict:
+        """문자 구간을 청크 딕셔너리로 변환 (줄 번호는 줄 시작 오프셋 배열에서 이진 탐색)"""
+        return {
+            "content": content[start:end],
+            "size": end - start,
+            "start_line": bisect.bisect_right(line_starts, start),
+            "end_line": bisect.bisect_right(line_starts, max(start, end - 1)),
+            "start_offset": start
+        }
+
+    def match_terms(self, content: str) -> set:
+        """태그 키워드/질문 트리거 단어 중 내용에 등장하는 단어 집합"""
+        if self._tag_needs_casefold:
+            content = content.lower()
+        
+        if self._tag_automaton is not None:
+            return {term for _, term in self._tag_automaton.iter(content)}
+        return {term for term in self._match_terms if term in content}
+
+    def extract_semantic_tags(self, content: str, matched_terms: Optional[set] = None) -> List[str]:
+        """의미 태그 추출 (matched_terms를 넘기면 내용을 다시 스캔하지 않음)"""
+        if matched_terms is None:
+            matched_terms = self.match_terms(content)
+        return [
+            tag for tag, keywords in self.semantic_keywords.items()
+            if not matched_terms.isdisjoint(keywords)
+        ]
 
     def generate_keywords(self, content: str) -> List[str]:
         """한국어 키워드 추출"""
         # 단순한 키워드 추출 (실제 구현시 형태소 분석기 사용 권장)
-        keywords = []
-        
-        # 한글 명사 패턴 추출 (2-8자)
-        korean_nouns = re.findall(r'[가-힣]{2,8}', content)
-        
-        # 빈도 기반 필터링
-        word_freq = {}
-        for word in korean_nouns:
-            word_freq[word] = word_freq.get(word, 0) + 1
-        
-        # 상위 빈도 단어들을 키워드로 선정
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        keywords = [word for word, freq in sorted_words[:20] if freq > 1]
+        # 한글 명사 패턴 추출 (2-8자) 후 빈도 집계
+        word_freq = Counter(self._korean_re.findall(content))
         
-        return keywords
+        # 상위 빈도 단어들을 키워드로 선정 (most_common(n)은 전체 정렬 없이 heapq.nlargest로 상위 n개만 고르며, 동률일 때 처음 등장한 순서 유지)
+        return [word for word, freq in word_freq.most_common(20) if freq > 1]
 
-    def generate_summary(self, content: str) -> str:
-        """요약 생성 (단순한 추출 기반)"""
-        sentences = re.split(r'[.!?]\s*', content)
+    def sentence_separators(self, content: str) -> Tuple[List[int], List[int]]:
+        """문장 구분자([.!?] + 공백) 구간의 시작/끝 오프셋 배열"""
+        starts = []
+        ends = []
+        for match in self._sentence_end_re.finditer(content):
+            starts.append(match.start())
+            ends.append(match.end())
+        return starts, ends
+
+    def _chunk_separators(self, separators: Tuple[List[int], List[int]], start: int, end: int) -> List[Tuple[int, int]]:
+        """문서 전체 구분자 중 청크 [start, end) 안에서 시작하는 것을 청크 기준 오프셋으로 변환
+        
+        청크 앞에서 시작해 걸쳐 들어온 구분자는 청크 안쪽이 공백뿐이라 청크만 스캔할 때도 구분자가 아니고,
+        청크 끝을 넘는 구분자는 끝에서 잘리므로 청크를 따로 스캔한 결과와 같음
+        """
+        starts, ends = separators
+        lo = bisect.bisect_left(starts, start)
+        hi = bisect.bisect_left(starts, end, lo)
+        return [(starts[k] - start, min(ends[k], end) - start) for k in range(lo, hi)]
+
+    def generate_summary(self, content: str, separators: Optional[List[Tuple[int, int]]] = None) -> str:
+        """요약 생성 (단순한 추출 기반, separators를 넘기면 문장 구분자를 다시 스캔하지 않음)"""
+        if separators is None:
+            separators = [match.span() for match in self._sentence_end_re.finditer(content)]
+        
+        # 문장 리스트를 만들지 않고 구분자 위치만 훑으며 첫 문장과 (처음/마지막을 뺀) 가장 긴 문장 구간을 추적
+        sentence_count = 0
+        first_span = longest_span = (0, 0)
+        longest_len = 0
+        prev_end = 0
+        for sep_start, sep_end in separators:
+            if sentence_count == 0:
+                first_span = (prev_end, sep_start)
+            elif sep_start - prev_end > longest_len:
+                longest_span = (prev_end, sep_start)
+                longest_len = sep_start - prev_end
+            sentence_count += 1
+            prev_end = sep_end
+        sentence_count += 1  # 마지막 구분자 뒤의 남은 문장
         
         # 첫 번째와 마지막 문장, 그리고 가장 긴 문장들 선택
-        if len(sentences) <= 3:
+        if sentence_count <= 3:
             return content[:200] + "..." if len(content) > 200 else content
         
-        summary_parts = [sentences[0]]  # 첫 문장
+        summary_parts = [content[first_span[0]:first_span[1]]]  # 첫 문장
         
         # 가장 긴 문장 추가
-        longest_sentence = max(sentences[1:-1], key=len, default="")
+        longest_sentence = content[longest_span[0]:longest_span[1]]
         if longest_sentence and longest_sentence not in summary_parts:
             summary_parts.append(longest_sentence)
         
         # 마지막 문장 추가
-        if sentences[-1] and sentences[-1] not in summary_parts:
-            summary_parts.append(sentences[-1])
+        last_sentence = content[prev_end:]
+        if last_sentence and last_sentence not in summary_parts:
+            summary_parts.append(last_sentence)
         
         summary = ". ".join(summary_parts)
         return summary[:300] + "..." if len(summary) > 300 else summary
 
-    def generate_question_variants(self, content: str) -> List[str]:
-        """질문 변형 생성"""
+    def generate_question_variants(self, content: str, keywords: Optional[List[str]] = None,
+                                   matched_terms: Optional[set] = None) -> List[str]:
+        """질문 변형 생성 (keywords/matched_terms를 넘기면 키워드 추출과 트리거 단어 스캔을 다시 하지 않음)"""
         questions = []
         
         # 내용 기반 질문 패턴
-        if "금지" in content or "제한" in content:
-            questions.append("무엇이 금지되나요?")
-            questions.append("어떤 제한사항이 있나요?")
-        
-        if "승인" in content or "허가" in content:
-            questions.append("승인 조건은 무엇인가요?")
-            questions.append("어떻게 승인받을 수 있나요?")
-        
-        if "템플릿" in content:
-            questions.append("템플릿 작성 방법은?")
-            questions.append("템플릿 규칙은 무엇인가요?")
+        if matched_terms is None:
+            matched_terms = self.match_terms(content)
+        for terms, pattern_questions in self.question_patterns:
+            if not matched_terms.isdisjoint(terms):
+                questions.extend(pattern_questions)
         
         # 일반적인 질문 추가
-        keywords = self.generate_keywords(content)
+        if keywords is None:
+            keywords = self.generate_keywords(content)
         if keywords:
             questions.append(f"{keywords[0]}에 대해 알려주세요")
             questions.append(f"{keywords[0]}와 관련된 정책은?")
@@ -247,36 +471,112 @@ class AdvancedRAGPreprocessor:
         
         return context
 
-    def process_file(self, file_path: Path) -> List[EnhancedChunk]:
-        """파일 처리"""
-        print(f"처리 중: {file_path.name}")
-        
-        # 파일 읽기
-        content = self.read_markdown_file(file_path)
+    def _content_key(self, content: str) -> str:
+        """파생 결과 캐시 키 (청크 내용의 BLAKE2b 해시)"""
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+
+    def derive_representations(self, content: str,
+                               separators: Optional[List[Tuple[int, int]]] = None) -> Dict[str, Any]:
+        """요약/키워드/질문 변형/의미 태그 생성 (내용 해시로 캐시)"""
+        key = self._content_key(content)
+        derived = self._derivation_cache.get(key)
+        if derived is None:
+            # 키워드와 매칭 단어는 한 번만 추출해 질문 변형/의미 태그에 재사용
+            keywords = self.generate_keywords(content)
+            matched_terms = self.match_terms(content)
+            derived = {
+                "summarized": self.generate_summary(content, separators),
+                "keywords": keywords,
+                "question_variants": self.generate_question_variants(content, keywords, matched_terms),
+                "semantic_tags": self.extract_semantic_tags(content, matched_terms)
+            }
+            self._derivation_cache[key] = derived
+        return derived
+
+    def _load_derivation_cache(self) -> Dict[str, Dict[str, Any]]:
+        """이전 실행에서 저장한 파생 결과 캐시 로드 (버전이 다르거나 손상되면 무시)"""
+        try:
+            cache = orjson.loads(self._derivation_cache_file.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return {}
+        if cache.get("version") != DERIVATION_CACHE_VERSION:
+            return {}
+        return cache.get("entries", {})
+
+    def _save_derivation_cache(self, chunks: List[EnhancedChunk]):
+        """이번 실행의 청크 기준으로 파생 결과 캐시 저장 (워커 프로세스 결과 포함, 사용하지 않은 항목은 정리)"""
+        entries = {}
+        for chunk in chunks:
+            entries[self._content_key(chunk.content["original"])] = {
+                "summarized": chunk.content["summarized"],
+                "keywords": chunk.content["keywords"],
+                "question_variants": chunk.content["question_variants"],
+                "semantic_tags": chunk.metadata["semantic_tags"]
+            }
+        self._derivation_cache = entries
+        self._derivation_cache_file.write_bytes(
+            orjson.dumps({"version": DERIVATION_CACHE_VERSION, "entries": entries})
+        )
+
+    def save_hierarchy(self, document_stem: str, hierarchy: Dict[str, Any]) -> str:
+        """문서 계층 구조를 hierarchies/{문서명}.json으로 저장하고 청크에서 참조할 이름 반환"""
+        hierarchy_dir = self.output_dir / "hierarchies"
+        hierarchy_dir.mkdir(exist_ok=True)
+        (hierarchy_dir / f"{document_stem}.json").write_bytes(
+            orjson.dumps(hierarchy, option=orjson.OPT_INDENT_2)
+        )
+        return document_stem
+
+    def process_file(self, file_path: Path, data: Optional[bytes] = None) -> List[EnhancedChunk]:
+        """파일 처리 (data를 넘기면 미리 읽어 둔 바이트 사용)"""
+        # 파일 읽기 (미리 읽은 바이트는 한 번만 디코딩해 계층 추출/청킹에 공유)
+        if data is None:
+            data = self.read_markdown_bytes(file_path)
+        content = data.decode('utf-8')
+        
+        # 계층 구조 추출 (줄 시작 오프셋은 문서당 한 번만 계산)
+        hierarchy = self.extract_hierarchy(content, self.line_starts(content))
+        
+        # 청킹 (기본은 의미 기반)
+        if self.chunking == "cdc":
+            chunks = self.cdc_chunking(content)
+        elif self.chunking == "embedding":
+            chunks = self.embedding_chunking(content)
+        else:
+            chunks = self.semantic_chunking(content, hierarchy)
         
-        # 계층 구조 추출
-        hierarchy = self.extract_hierarchy(content)
+        # 계층 구조는 청크마다 복제하지 않고 문서당 한 번 별도 파일로 저장
+        hierarchy_ref = self.save_hierarchy(file_path.stem, hierarchy)
+        header_indices = [k for k, h in enumerate(hierarchy["structure"]) if h["type"] == "header"]
+        header_lines = [hierarchy["structure"][k]["line_number"] for k in header_indices]
         
-        # 의미 기반 청킹
-        chunks = self.semantic_chunking(content, hierarchy)
+        # 문장 구분자는 문서 전체에서 한 번만 스캔 (청크 오버랩 구간을 다시 스캔하지 않음)
+        separators = self.sentence_separators(content)
         
         enhanced_chunks = []
         
         for i, chunk_data in enumerate(chunks):
             chunk_content = chunk_data["content"]
             
-            # 다중 표현 생성
+            # 다중 표현 생성 (내용이 같은 청크는 캐시된 파생 결과 재사용, 문장 구분자는 문서 스캔 결과에서 잘라 씀)
+            chunk_start = chunk_data["start_offset"]
+            derived = self.derive_representations(
+                chunk_content,
+                self._chunk_separators(separators, chunk_start, chunk_start + len(chunk_content))
+            )
             content_representations = {
                 "original": chunk_content,
-                "summarized": self.generate_summary(chunk_content),
-                "keywords": self.generate_keywords(chunk_content),
-                "question_variants": self.generate_question_variants(chunk_content)
+                "summarized": derived["summarized"],
+                "keywords": derived["keywords"],
+                "question_variants": derived["question_variants"]
             }
             
-            # 메타데이터 생성
+            # 메타데이터 생성 (section_id: 청크 시작 줄을 감싸는 헤더의 계층 구조 인덱스, 첫 헤더 이전이면 None)
+            section_pos = bisect.bisect_right(header_lines, chunk_data["start_line"]) - 1
             metadata = {
-                "document_hierarchy": hierarchy,
-                "semantic_tags": self.extract_semantic_tags(chunk_content),
+                "document_hierarchy_ref": hierarchy_ref,
+                "section_id": header_indices[section_pos] if section_pos >= 0 else None,
+                "semantic_tags": derived["semantic_tags"],
                 "start_line": chunk_data["start_line"],
                 "end_line": chunk_data["end_line"],
                 "relationships": {
@@ -289,9 +589,9 @@ class AdvancedRAGPreprocessor:
             # 컨텍스트 추출
             context = self.get_context(chunks, i)
             
-            # 고유 ID 생성
-            content_hash = hashlib.md5(chunk_content.encode('utf-8')).hexdigest()
-            chunk_id = f"{file_path.stem}_{i:03d}_{content_hash[:8]}"
+            # 고유 ID 생성 (보안 용도가 아니므로 MD5 대신 빠른 BLAKE2b 4바이트 다이제스트 사용)
+            content_hash = hashlib.blake2b(chunk_content.encode('utf-8'), digest_size=4).hexdigest()
+            chunk_id = f"{file_path.stem}_{i:03d}_{content_hash}"
             
             enhanced_chunk = EnhancedChunk(
                 id=chunk_id,
@@ -309,11 +609,26 @@ class AdvancedRAGPreprocessor:
         return enhanced_chunks
 
     def save_to_jsonl(self, chunks: List[EnhancedChunk], output_file: Path):
-        """JSONL 형태로 저장"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for chunk in chunks:
-                json_line = json.dumps(asdict(chunk), ensure_ascii=False, separators=(',', ':'))
-                f.write(json_line + '\n')
+        """JSONL 형태로 저장 (orjson이 dataclass를 asdict 복사 없이 바로 직렬화)"""
+        # 청크마다 write를 호출하지 않고 직렬화한 줄을 모아 한 번에 기록
+        output_file.write_bytes(b''.join(
+            orjson.dumps(chunk, option=orjson.OPT_APPEND_NEWLINE) for chunk in chunks
+        ))
+
+    def _read_prefetch(self, file_path: Path) -> Optional[bytes]:
+        """읽기 스레드용: 파일 바이트 반환 (실패하면 None을 반환해 워커가 다시 읽으며 오류를 보고)"""
+        try:
+            return self.read_markdown_bytes(file_path)
+        except OSError:
+            return None
+
+    def _process_file_safe(self, task: Tuple[Path, Optional[bytes]]) -> Tuple[List[EnhancedChunk], Optional[str]]:
+        """워커 프로세스용: (파일 경로, 미리 읽은 바이트)를 처리한 결과와 오류 메시지 반환 (예외는 결과로 전달)"""
+        file_path, data = task
+        try:
+            return self.process_file(file_path, data), None
+        except Exception as e:
+            return [], str(e)
 
     def process_all_files(self):
         """모든 마크다운 파일 처리"""
@@ -326,27 +641,45 @@ class AdvancedRAGPreprocessor:
         all_chunks = []
         file_stats = {}
         
-        for md_file in md_files:
-            try:
-                chunks = self.process_file(md_file)
-                all_chunks.extend(chunks)
-                
-                file_stats[md_file.name] = {
-                    "chunks_count": len(chunks),
-                    "total_chars": sum(chunk.char_count for chunk in chunks),
-                    "avg_chunk_size": sum(chunk.char_count for chunk in chunks) // len(chunks) if chunks else 0
-                }
-                
-                print(f"  - {len(chunks)}개 청크 생성, 평균 크기: {file_stats[md_file.name]['avg_chunk_size']}자")
-                
-            except Exception as e:
-                print(f"오류 발생 - {md_file.name}: {str(e)}")
+        # 파일 읽기는 스레드 풀에서 미리 시작해 두고, 읽힌 순서대로 처리에 넘겨 디스크 대기와 CPU 작업을 겹침
+        # 파일별 처리는 서로 독립적인 CPU 작업이므로 프로세스 풀에서 병렬 처리
+        # (임베딩 청킹은 모델을 워커마다 복제하지 않도록 현재 프로세스에서 순차 처리)
+        with ThreadPoolExecutor(max_workers=min(8, len(md_files))) as reader:
+            reads = [reader.submit(self._read_prefetch, md_file) for md_file in md_files]
+            tasks = ((md_file, read.result()) for md_file, read in zip(md_files, reads))
+            
+            if self._sentence_model is None and len(md_files) > 1:
+                # 워커마다 설정으로 전처리기를 한 번 만들고, 작업에는 (경로, 바이트)만 넘김
+                with Pool(processes=min(os.cpu_count() or 1, len(md_files)),
+                          initializer=_init_worker,
+                          initargs=(str(self.input_dir), str(self.output_dir), self.chunking)) as pool:
+                    results = list(pool.imap(_process_file_worker, tasks))
+            else:
+                results = [self._process_file_safe(task) for task in tasks]
+        
+        # 통계 집계와 출력은 메인 프로세스에서 파일 순서대로 수행
+        for md_file, (chunks, error) in zip(md_files, results):
+            print(f"처리 중: {md_file.name}")
+            
+            if error is not None:
+                print(f"오류 발생 - {md_file.name}: {error}")
                 continue
+            
+            all_chunks.extend(chunks)
+            
+            file_stats[md_file.name] = {
+                "chunks_count": len(chunks),
+                "total_chars": sum(chunk.char_count for chunk in chunks),
+                "avg_chunk_size": sum(chunk.char_count for chunk in chunks) // len(chunks) if chunks else 0
+            }
+            
+            print(f"  - {len(chunks)}개 청크 생성, 평균 크기: {file_stats[md_file.name]['avg_chunk_size']}자")
         
         # 결과 저장
         if all_chunks:
             output_file = self.output_dir / "enhanced_chunks.jsonl"
             self.save_to_jsonl(all_chunks, output_file)
+            self._save_derivation_cache(all_chunks)
             
             # 통계 정보 저장
             stats = {
@@ -359,24 +692,44 @@ class AdvancedRAGPreprocessor:
             }
             
             stats_file = self.output_dir / "processing_stats.json"
-            with open(stats_file, 'w', encoding='utf-8') as f:
-                json.dump(stats, f, ensure_ascii=False, indent=2)
+            with open(stats_file, 'wb') as f:
+                f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2))
             
             print(f"\n=== 처리 완료 ===")
             print(f"총 {len(all_chunks)}개 청크가 생성되어 {output_file}에 저장되었습니다.")
             print(f"통계 정보: {stats_file}")
+            print(f"문서 계층 구조: {self.output_dir / 'hierarchies'}")
             print(f"평균 청크 크기: {stats['avg_chunk_size']}자")
         
         else:
             print("처리된 청크가 없습니다.")
 
+# 프로세스 풀 워커의 전처리기 (작업마다 캐시/오토마톤을 포함한 전처리기 전체를 pickle 하지 않도록 워커당 한 번 생성)
+_worker_preprocessor: Optional[AdvancedRAGPreprocessor] = None
+
+def _init_worker(input_dir: str, output_dir: str, chunking: str):
+    """프로세스 풀 initializer: 워커 프로세스에서 전처리기 생성"""
+    global _worker_preprocessor
+    _worker_preprocessor = AdvancedRAGPreprocessor(input_dir, output_dir, chunking=chunking)
+
+def _process_file_worker(task: Tuple[Path, Optional[bytes]]) -> Tuple[List[EnhancedChunk], Optional[str]]:
+    """프로세스 풀 작업: 워커의 전처리기로 (파일 경로, 미리 읽은 바이트) 처리"""
+    return _worker_preprocessor._process_file_safe(task)
+
 def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="고도화된 RAG용 데이터 전처리")
+    parser.add_argument("--chunking", choices=["semantic", "cdc", "embedding"], default="semantic",
+                        help="청킹 방식 (semantic: 라인 규칙 기반, cdc: fastcdc 내용 기반, embedding: 문장 임베딩 거리 기반)")
+    args = parser.parse_args()
+    
     # 경로 설정
     input_dir = "data/policies"
     output_dir = "data/enhanced_chunks"
     
     # 전처리기 초기화 및 실행
-    preprocessor = AdvancedRAGPreprocessor(input_dir, output_dir)
+    preprocessor = AdvancedRAGPreprocessor(input_dir, output_dir, chunking=args.chunking)
     preprocessor.process_all_files()
 
 if __name__ == "__main__":
@@ -15,7 +15,8 @@ def create_database_and_tables():
         'user': os.getenv('DB_USER', 'steve'),
         'password': os.getenv('DB_PASSWORD', 'doolman'),
         'charset': os.getenv('DB_CHARSET', 'utf8mb4'),
-        'collation': 'utf8mb4_unicode_ci'
+        'collation': 'utf8mb4_unicode_ci',
+        'use_pure': False  # C 확장 사용 (설치되어 있지 않으면 순수 파이썬 구현으로 동작)
     }
     
     connection = None
@@ -28,11 +29,13 @@ def create_database_and_tables():
         
         # 데이터베이스 생성
         db_name = os.getenv('DB_NAME', 'alimtalk_ai')
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci")
-        cursor.execute(f"USE {db_name}")
+        ddl_statements = [
+            f"CREATE DATABASE IF NOT EXISTS {db_name} CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci",
+            f"USE {db_name}",
+        ]
         
         # 사용자 템플릿 요청 테이블
-        cursor.execute("""
+        ddl_statements.append("""
         CREATE TABLE IF NOT EXISTS template_requests (
             id INT AUTO_INCREMENT PRIMARY KEY,
             user_input TEXT NOT NULL COMMENT '사용자 입력 메시지',
@@ -44,7 +47,7 @@ def create_database_and_tables():
         """)
         
         # 생성된 템플릿 테이블
-        cursor.execute("""
+        ddl_statements.append("""
         CREATE TABLE IF NOT EXISTS generated_templates (
             id INT AUTO_INCREMENT PRIMARY KEY,
             request_id INT NOT NULL,
@@ -59,7 +62,7 @@ def create_database_and_tables():
         """)
         
         # 정책 문서 메타데이터 테이블
-        cursor.execute("""
+        ddl_statements.append("""
         CREATE TABLE IF NOT EXISTS policy_documents (
             id INT AUTO_INCREMENT PRIMARY KEY,
             document_type VARCHAR(50) NOT NULL,
@@ -71,6 +74,10 @@ def create_database_and_tables():
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
         """)
         
+        # DDL을 하나의 다중 문장으로 묶어 한 번에 전송 (결과 이터레이터를 끝까지 소비해야 모두 실행됨)
+        for _ in cursor.execute(";".join(ddl_statements), multi=True):
+            pass
+        
         connection.commit()
         print("Database and tables created successfully.")
         
@@ -85,6 +92,7 @@ def create_database_and_tables():
             ('알림톡기본정책', 'infotalk-basic.jsonl', 6, 2090, 7.0)
         ]
         
+        # executemany는 INSERT ... VALUES 문을 여러 행 VALUES 하나로 재작성해 한 번에 전송
         cursor.executemany("""
         INSERT INTO policy_documents (document_type, file_name, chunk_count, total_chars, file_size_kb)
         VALUES (%s, %s, %s, %s, %s)
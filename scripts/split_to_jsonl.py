@@ -3,26 +3,27 @@
 JSON 파일을 문서 타입별 JSONL 파일로 분리
 """
 
-import json
+import orjson
 from pathlib import Path
-from collections import defaultdict
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+def iter_chunks(input_file: Path):
+    """JSON 배열의 청크를 하나씩 반환 (ijson이 있으면 파일 전체를 메모리에 올리지 않고 스트리밍)"""
+    with open(input_file, 'rb') as f:
+        if ijson is not None:
+            yield from ijson.items(f, 'item', use_float=True)
+        else:
+            yield from orjson.loads(f.read())
 
 def main():
     """JSON을 문서 타입별 JSONL로 분리"""
     input_file = Path("data/cleaned_v4/processed_chunks.json")
     output_dir = Path("data/cleaned_v4")
     
-    # JSON 파일 읽기
-    with open(input_file, 'r', encoding='utf-8') as f:
-        chunks = json.load(f)
-    
-    # 문서 타입별로 그룹화
-    doc_groups = defaultdict(list)
-    
-    for chunk in chunks:
-        doc_type = chunk["metadata"]["document_type"]
-        doc_groups[doc_type].append(chunk)
-    
     # 파일명 매핑
     filename_mapping = {
         "콘텐츠가이드": "content-guide.jsonl",
@@ -34,25 +35,33 @@ def main():
         "공용템플릿": "public-template.jsonl"
     }
     
-    # 각 문서 타입별로 JSONL 파일 생성
+    # 청크를 읽는 대로 문서 타입별 JSONL 파일에 바로 기록 (파일은 타입이 처음 나올 때 열기)
     file_stats = {}
+    handles = {}
+    
+    try:
+        for chunk in iter_chunks(input_file):
+            doc_type = chunk["metadata"]["document_type"]
+            filename = filename_mapping.get(doc_type, f"{doc_type}.jsonl")
+            
+            if doc_type not in handles:
+                handles[doc_type] = open(output_dir / filename, 'wb')
+                file_stats[filename] = {
+                    "document_type": doc_type,
+                    "chunk_count": 0,
+                    "total_chars": 0
+                }
+            
+            handles[doc_type].write(orjson.dumps(chunk, option=orjson.OPT_APPEND_NEWLINE))
+            file_stats[filename]["chunk_count"] += 1
+            file_stats[filename]["total_chars"] += chunk["metadata"]["char_count"]
+    finally:
+        for handle in handles.values():
+            handle.close()
     
-    for doc_type, chunks_list in doc_groups.items():
-        filename = filename_mapping.get(doc_type, f"{doc_type}.jsonl")
-        output_file = output_dir / filename
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for chunk in chunks_list:
-                f.write(json.dumps(chunk, ensure_ascii=False) + '\n')
-        
-        file_stats[filename] = {
-            "document_type": doc_type,
-            "chunk_count": len(chunks_list),
-            "total_chars": sum(chunk["metadata"]["char_count"] for chunk in chunks_list),
-            "file_size_kb": round(output_file.stat().st_size / 1024, 1)
-        }
-        
-        print(f"Created: {filename} ({len(chunks_list)} chunks)")
+    for filename, stats in file_stats.items():
+        stats["file_size_kb"] = round((output_dir / filename).stat().st_size / 1024, 1)
+        print(f"Created: {filename} ({stats['chunk_count']} chunks)")
     
     # 분리 통계 저장
     split_stats = {
@@ -62,8 +71,8 @@ def main():
     }
     
     stats_file = output_dir / "split_statistics.json"
-    with open(stats_file, 'w', encoding='utf-8') as f:
-        json.dump(split_stats, f, ensure_ascii=False, indent=2)
+    with open(stats_file, 'wb') as f:
+        f.write(orjson.dumps(split_stats, option=orjson.OPT_INDENT_2))
     
     print(f"\n=== 분리 완료 ===")
     print(f"생성된 JSONL 파일: {len(file_stats)}개")